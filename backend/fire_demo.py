@@ -3,31 +3,77 @@ Example usage of the Fire Perimeter Service for EmberAI
 Run this script to test the fire perimeter data ingestion
 """
 
+import asyncio
 import json
-from fire_perimeter_service import FirePerimeterService, FirePerimeterType
+import logging
+from operator import attrgetter
+import numpy as np
+from fire_perimeter_service import FirePerimeterService, AsyncFirePerimeterService, FirePerimeterType, run_async
 
+log = logging.getLogger(__name__)
 
-def main():
+# Fields read per top-risk fire in the danger zone analysis
+_danger_zone_fields = attrgetter('incident_name', 'state', 'poi_longitude', 'poi_latitude')
+
+
+def _unwrap(result):
+    """Re-raise an exception captured by asyncio.gather(return_exceptions=True)"""
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+async def main():
     """Main function to demonstrate fire perimeter service usage"""
     
-    print("🔥 EmberAI Fire Perimeter Service Demo")
-    print("=" * 50)
+    log.info("🔥 EmberAI Fire Perimeter Service Demo\n%s", "=" * 50)
     
-    # Initialize the service
+    # Initialize the services (the sync service handles parsing and saving)
     fire_service = FirePerimeterService()
     
+    # The example queries are independent, so issue them concurrently over
+    # one shared client instead of paying each round-trip in turn
+    log.info("\nFetching fire data from NIFC/WFIGS...")
+    async with AsyncFirePerimeterService() as async_service:
+        results = await asyncio.gather(
+            async_service.get_fire_perimeters_async(
+                FirePerimeterType.CURRENT,
+                min_acres=100  # Only fires > 100 acres
+            ),
+            async_service.get_high_priority_fires_async(
+                min_acres=1000,      # At least 1000 acres
+                max_containment=50,   # Less than 50% contained
+                structures_threatened=1  # At least 1 structure threatened
+            ),
+            async_service.get_fires_by_coordinates_async(
+                latitude=34.0522,   # Los Angeles coordinates
+                longitude=-118.2437,
+                radius_miles=100    # Within 100 miles
+            ),
+            async_service.get_fire_perimeters_async(
+                FirePerimeterType.CURRENT,
+                state_code="CA",
+                min_acres=50
+            ),
+            async_service.get_high_priority_fires_async(
+                min_acres=500,
+                max_containment=75
+            ),
+            async_service.get_fire_perimeters_async(FirePerimeterType.CURRENT),
+            return_exceptions=True
+        )
+    
+    current_fires, priority_fires, la_fires, ca_fires, ember_fires, test_request = results
+    
     # Example 1: Get current fires nationwide
-    print("\n1. Fetching current fires nationwide...")
+    log.info("\n1. Current fires nationwide...")
     try:
-        current_fires = fire_service.get_fire_perimeters(
-            perimeter_type=FirePerimeterType.CURRENT,
-            min_acres=100  # Only fires > 100 acres
-        )
+        current_fires = _unwrap(current_fires)
         
         fire_count = len(current_fires.get('features', []))
-        print(f"   ✅ Found {fire_count} active fires > 100 acres")
+        log.info("   ✅ Found %d active fires > 100 acres", fire_count)
         
-        if fire_count > 0:
+        if fire_count > 0 and log.isEnabledFor(logging.INFO):
             # Show some details about the largest fire
             largest_fire = max(
                 current_fires['features'],
@@ -35,28 +81,27 @@ def main():
             )
             
             props = largest_fire.get('properties', {})
-            print(f"   🔥 Largest fire: {props.get('IncidentName', 'Unknown')}")
-            print(f"      📍 Location: {props.get('POOState', 'Unknown')}")
-            print(f"      📏 Size: {props.get('DailyAcres', 0):,} acres")
-            print(f"      🚧 Containment: {props.get('PercentContained', 0)}%")
+            log.info(
+                "   🔥 Largest fire: %s\n      📍 Location: %s\n      📏 Size: %s acres\n      🚧 Containment: %s%%",
+                props.get('IncidentName', 'Unknown'),
+                props.get('POOState', 'Unknown'),
+                f"{props.get('DailyAcres', 0):,}",
+                props.get('PercentContained', 0)
+            )
             
     except Exception as e:
-        print(f"   ❌ Error: {str(e)}")
+        log.error("   ❌ Error: %s", e)
     
     # Example 2: Get high-priority fires for ember analysis
-    print("\n2. Fetching high-priority fires for ember analysis...")
+    log.info("\n2. High-priority fires for ember analysis...")
     try:
-        priority_fires = fire_service.get_high_priority_fires(
-            min_acres=1000,      # At least 1000 acres
-            max_containment=50,   # Less than 50% contained
-            structures_threatened=1  # At least 1 structure threatened
-        )
+        priority_fires = _unwrap(priority_fires)
         
         priority_count = len(priority_fires.get('features', []))
-        print(f"   ✅ Found {priority_count} high-priority fires")
+        log.info("   ✅ Found %d high-priority fires", priority_count)
         
-        if priority_count > 0:
-            print("   🚨 High-priority fires:")
+        if priority_count > 0 and log.isEnabledFor(logging.INFO):
+            lines = ["   🚨 High-priority fires:"]
             for feature in priority_fires['features'][:3]:  # Show first 3
                 props = feature.get('properties', {})
                 name = props.get('IncidentName', 'Unknown')
@@ -65,136 +110,132 @@ def main():
                 containment = props.get('PercentContained', 0)
                 structures = props.get('StructuresThreated', 0)
                 
-                print(f"      • {name} ({state}): {acres:,} acres, {containment}% contained, {structures} structures threatened")
+                lines.append(f"      • {name} ({state}): {acres:,} acres, {containment}% contained, {structures} structures threatened")
+            log.info("\n".join(lines))
         
     except Exception as e:
-        print(f"   ❌ Error: {str(e)}")
+        log.error("   ❌ Error: %s", e)
     
     # Example 3: Get fires near a specific location (Los Angeles)
-    print("\n3. Fetching fires near Los Angeles...")
+    log.info("\n3. Fires near Los Angeles...")
     try:
-        la_fires = fire_service.get_fires_by_coordinates(
-            latitude=34.0522,   # Los Angeles coordinates
-            longitude=-118.2437,
-            radius_miles=100    # Within 100 miles
-        )
+        la_fires = _unwrap(la_fires)
         
         la_count = len(la_fires.get('features', []))
-        print(f"   ✅ Found {la_count} fires within 100 miles of Los Angeles")
+        log.info("   ✅ Found %d fires within 100 miles of Los Angeles", la_count)
         
-        if la_count > 0:
-            print("   🏙️ Fires near Los Angeles:")
+        if la_count > 0 and log.isEnabledFor(logging.INFO):
+            lines = ["   🏙️ Fires near Los Angeles:"]
             for feature in la_fires['features'][:3]:  # Show first 3
                 props = feature.get('properties', {})
                 name = props.get('IncidentName', 'Unknown')
                 acres = props.get('DailyAcres', 0)
                 containment = props.get('PercentContained', 0)
                 
-                print(f"      • {name}: {acres:,} acres, {containment}% contained")
+                lines.append(f"      • {name}: {acres:,} acres, {containment}% contained")
+            log.info("\n".join(lines))
         
     except Exception as e:
-        print(f"   ❌ Error: {str(e)}")
+        log.error("   ❌ Error: %s", e)
     
     # Example 4: Get fires by state (California)
-    print("\n4. Fetching fires in California...")
+    log.info("\n4. Fires in California...")
     try:
-        ca_fires = fire_service.get_fire_perimeters(
-            perimeter_type=FirePerimeterType.CURRENT,
-            state_code="CA",
-            min_acres=50
-        )
+        ca_fires = _unwrap(ca_fires)
         
         ca_count = len(ca_fires.get('features', []))
         total_acres = sum(f.get('properties', {}).get('DailyAcres', 0) for f in ca_fires.get('features', []))
         
-        print(f"   ✅ Found {ca_count} fires in California")
-        print(f"   🔥 Total acres burned: {total_acres:,} acres")
+        log.info("   ✅ Found %d fires in California\n   🔥 Total acres burned: %s acres", ca_count, f"{total_acres:,}")
         
     except Exception as e:
-        print(f"   ❌ Error: {str(e)}")
+        log.error("   ❌ Error: %s", e)
     
     # Example 5: Parse fire data and create danger zones
-    print("\n5. Creating ember danger zone analysis...")
+    log.info("\n5. Creating ember danger zone analysis...")
     try:
-        # Get fires suitable for ember analysis
-        ember_fires = fire_service.get_high_priority_fires(
-            min_acres=500,
-            max_containment=75
-        )
+        # Fires suitable for ember analysis
+        ember_fires = _unwrap(ember_fires)
         
         ember_count = len(ember_fires.get('features', []))
         
         if ember_count > 0:
-            print(f"   ✅ Analyzing {ember_count} fires for ember transport potential")
+            log.info("   ✅ Analyzing %d fires for ember transport potential", ember_count)
             
             # Parse fire features into objects
             fire_objects = fire_service.parse_fire_features(ember_fires)
             
-            # Simple danger zone analysis
+            # Simple danger zone analysis, computed for every fire in one vectorized pass
+            acres = np.array([fire.acres for fire in fire_objects], dtype=np.float64)
+            containment = np.array([fire.containment_percent for fire in fire_objects], dtype=np.float64)
+            
+            # Calculate danger zone radius based on fire size and containment
+            base_radius = np.minimum(acres / 100, 10)  # Base radius in miles
+            containment_multiplier = (100 - containment) / 100
+            danger_radius = base_radius * containment_multiplier
+            risk_level = np.select([danger_radius > 5, danger_radius > 2], ["HIGH", "MEDIUM"], default="LOW")
+            
+            # Show top 3 highest risk fires
             danger_zones = []
-            for fire in fire_objects:
-                # Calculate danger zone radius based on fire size and containment
-                base_radius = min(fire.acres / 100, 10)  # Base radius in miles
-                containment_multiplier = (100 - fire.containment_percent) / 100
-                danger_radius = base_radius * containment_multiplier
-                
+            for i in np.argsort(-danger_radius, kind="stable")[:3].tolist():
+                name, state, longitude, latitude = _danger_zone_fields(fire_objects[i])
                 danger_zones.append({
-                    "fire_name": fire.incident_name,
-                    "fire_state": fire.state,
-                    "fire_acres": fire.acres,
-                    "containment_percent": fire.containment_percent,
-                    "danger_zone_radius_miles": round(danger_radius, 2),
-                    "ember_risk_level": "HIGH" if danger_radius > 5 else "MEDIUM" if danger_radius > 2 else "LOW",
-                    "coordinates": [fire.poi_longitude, fire.poi_latitude]
+                    "fire_name": name,
+                    "fire_state": state,
+                    "fire_acres": fire_objects[i].acres,
+                    "containment_percent": fire_objects[i].containment_percent,
+                    "danger_zone_radius_miles": round(float(danger_radius[i]), 2),
+                    "ember_risk_level": str(risk_level[i]),
+                    "coordinates": [longitude, latitude]
                 })
             
-            # Show top 3 highest risk fires
-            danger_zones.sort(key=lambda x: x["danger_zone_radius_miles"], reverse=True)
-            
-            print("   🎯 Top ember risk fires:")
-            for zone in danger_zones[:3]:
-                print(f"      • {zone['fire_name']} ({zone['fire_state']})")
-                print(f"        Risk Level: {zone['ember_risk_level']}")
-                print(f"        Danger Zone: {zone['danger_zone_radius_miles']} miles")
-                print(f"        Fire Size: {zone['fire_acres']:,} acres")
-                print()
+            if log.isEnabledFor(logging.INFO):
+                lines = ["   🎯 Top ember risk fires:"]
+                for zone in danger_zones:
+                    lines.append(f"      • {zone['fire_name']} ({zone['fire_state']})")
+                    lines.append(f"        Risk Level: {zone['ember_risk_level']}")
+                    lines.append(f"        Danger Zone: {zone['danger_zone_radius_miles']} miles")
+                    lines.append(f"        Fire Size: {zone['fire_acres']:,} acres")
+                    lines.append("")
+                log.info("\n".join(lines))
             
             # Save the analysis
             saved_path = fire_service.save_fire_data(fire_objects, "ember_risk_analysis.json")
-            print(f"   💾 Saved ember risk analysis to: {saved_path}")
+            log.info("   💾 Saved ember risk analysis to: %s", saved_path)
         
         else:
-            print("   ℹ️  No fires found for ember analysis")
+            log.info("   ℹ️  No fires found for ember analysis")
             
     except Exception as e:
-        print(f"   ❌ Error: {str(e)}")
+        log.error("   ❌ Error: %s", e)
     
     # Example 6: API connectivity test
-    print("\n6. Testing API connectivity...")
+    log.info("\n6. Testing API connectivity...")
     try:
         # Simple test to verify API is accessible
-        test_request = fire_service.get_fire_perimeters(
-            perimeter_type=FirePerimeterType.CURRENT
-        )
+        test_request = _unwrap(test_request)
         
         if test_request and 'features' in test_request:
-            print("   ✅ API connectivity: OK")
-            print(f"   📊 Total active fires: {len(test_request['features'])}")
+            log.info("   ✅ API connectivity: OK\n   📊 Total active fires: %d", len(test_request['features']))
         else:
-            print("   ⚠️  API connectivity: Warning - No data returned")
+            log.warning("   ⚠️  API connectivity: Warning - No data returned")
             
     except Exception as e:
-        print(f"   ❌ API connectivity: Failed - {str(e)}")
+        log.error("   ❌ API connectivity: Failed - %s", e)
     
-    print("\n" + "=" * 50)
-    print("🎉 Demo completed!")
-    print("\nNext steps for EmberAI integration:")
-    print("1. Set up scheduled data ingestion (every 15-30 minutes)")
-    print("2. Integrate with weather data APIs for wind/atmospheric conditions")
-    print("3. Implement ember transport modeling algorithms")
-    print("4. Create real-time danger zone updates")
-    print("5. Connect to drone patrol coordination system")
+    log.info(
+        "\n%s\n🎉 Demo completed!\n"
+        "\nNext steps for EmberAI integration:\n"
+        "1. Set up scheduled data ingestion (every 15-30 minutes)\n"
+        "2. Integrate with weather data APIs for wind/atmospheric conditions\n"
+        "3. Implement ember transport modeling algorithms\n"
+        "4. Create real-time danger zone updates\n"
+        "5. Connect to drone patrol coordination system",
+        "=" * 50
+    )
 
 
 if __name__ == "__main__":
-    main()
+    # Plain messages on stdout, replacing the service module's default log format
+    logging.basicConfig(level=logging.INFO, format="%(message)s", force=True)
+    run_async(main())
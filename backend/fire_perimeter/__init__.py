@@ -7,8 +7,13 @@ from .fire_perimeter_service import (
     FirePerimeterService,
     AsyncFirePerimeterService,
     FirePerimeterType,
-    FirePerimeter
+    FirePerimeter,
+    FirePerimeterArray,
+    run_async
 )
+from .cache import TTLResponseCache, CacheEntry, SingleFlight
+from .analysis import summarize_fires, score_ember_risk, annotate_ember_risk
+from .spatial import FireSpatialIndex, RaggedGeometry, bbox_around, filter_within_radius, flatten_rings
 
 __version__ = "1.0.0"
 __author__ = "EmberAI Team"
@@ -17,5 +22,18 @@ __all__ = [
     "FirePerimeterService",
     "AsyncFirePerimeterService", 
     "FirePerimeterType",
-    "FirePerimeter"
+    "FirePerimeter",
+    "FirePerimeterArray",
+    "run_async",
+    "TTLResponseCache",
+    "CacheEntry",
+    "SingleFlight",
+    "summarize_fires",
+    "score_ember_risk",
+    "annotate_ember_risk",
+    "FireSpatialIndex",
+    "RaggedGeometry",
+    "bbox_around",
+    "filter_within_radius",
+    "flatten_rings"
 ]
@@ -0,0 +1,162 @@
+"""
+Fire analysis for EmberAI
+Vectorized statistics and ember risk scoring over GeoJSON fire features
+"""
+
+from operator import itemgetter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from numba import njit
+
+# NIFC properties read by the analysis helpers, fetched together by one getter
+_FIRE_FIELDS = ('IncidentName', 'DailyAcres', 'PercentContained', 'POOState', 'StructuresThreated')
+_PROPS = itemgetter(*_FIRE_FIELDS)
+
+# Risk level names indexed by the level bucket computed in _ember_risk_kernel
+_RISK_LEVELS = np.array(['LOW', 'MEDIUM', 'HIGH'])
+
+
+def _properties(features: List[Dict]) -> List[Dict]:
+    """Resolve each feature's properties dict once"""
+    return [feature.get('properties') or {} for feature in features]
+
+
+def _fire_columns(properties: List[Dict]) -> Dict[str, tuple]:
+    """
+    Read every analysis field of every feature in one pass
+    
+    Args:
+        properties: Feature properties dicts
+    
+    Returns:
+        Column tuples keyed by NIFC property name
+    """
+    rows = []
+    for props in properties:
+        try:
+            rows.append(_PROPS(props))
+        except KeyError:
+            # Sparse properties (e.g. hand-built features) fall back to per-field lookups
+            rows.append(tuple(props.get(name) for name in _FIRE_FIELDS))
+    
+    columns = zip(*rows) if rows else [()] * len(_FIRE_FIELDS)
+    
+    return dict(zip(_FIRE_FIELDS, columns))
+
+
+def _numeric_array(values: Sequence, dtype=np.float64) -> np.ndarray:
+    """Convert one property column into a contiguous array, treating missing values as 0"""
+    return np.fromiter((value or 0 for value in values), dtype=dtype, count=len(values))
+
+
+def summarize_fires(features: List[Dict]) -> Dict:
+    """
+    Compute summary statistics for a list of fire features
+    
+    Args:
+        features: GeoJSON features from a fire perimeter query
+    
+    Returns:
+        Totals, averages, affected state count and the largest fire
+    """
+    if not features:
+        return {
+            "total_fires": 0,
+            "total_acres": 0,
+            "avg_acres_per_fire": 0,
+            "states_affected": 0,
+            "largest_fire": None
+        }
+    
+    properties = _properties(features)
+    columns = _fire_columns(properties)
+    acres = _numeric_array(columns['DailyAcres'])
+    states = np.array([state or '' for state in columns['POOState']])
+    
+    total_acres = float(acres.sum())
+    largest_props = properties[int(acres.argmax())]
+    
+    return {
+        "total_fires": len(features),
+        "total_acres": total_acres,
+        "avg_acres_per_fire": total_acres / len(features),
+        "states_affected": int(np.unique(states).size),
+        "largest_fire": {
+            "name": largest_props.get('IncidentName', 'Unknown'),
+            "acres": largest_props.get('DailyAcres', 0),
+            "state": largest_props.get('POOState', 'Unknown'),
+            "containment": largest_props.get('PercentContained', 0)
+        }
+    }
+
+
+# Deliberately serial and without fastmath: a scoring call covers a few
+# hundred fires, so parallel=True spends more on thread-pool startup than the
+# loop costs, and it would start a Numba threading layer in every server
+# worker. fastmath lets the compiler assume no NaNs, which would change how
+# missing containment values compare against the thresholds
+@njit(cache=True)
+def _ember_risk_kernel(acres: np.ndarray, containment: np.ndarray):
+    """Score, level bucket and danger zone radius for every fire in one compiled pass"""
+    n = acres.size
+    score = np.empty(n, np.int64)
+    bucket = np.empty(n, np.int64)
+    radius = np.empty(n, np.int64)
+    
+    for i in range(n):
+        s = 3 if acres[i] > 5000 else 2 if acres[i] > 1000 else 1
+        s += 2 if containment[i] < 25 else 1 if containment[i] < 50 else 0
+        score[i] = s
+        bucket[i] = 2 if s >= 4 else 1 if s >= 2 else 0
+        radius[i] = min(s * 2, 10)  # Max 10 miles
+    
+    return score, bucket, radius
+
+
+def score_ember_risk(acres: np.ndarray, containment: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score ember spotfire risk from fire size and containment
+    
+    Args:
+        acres: Fire sizes in acres
+        containment: Containment percentages
+    
+    Returns:
+        Tuple of (risk score, risk level, danger zone radius in miles) arrays
+    """
+    score, bucket, radius = _ember_risk_kernel(
+        np.ascontiguousarray(acres, dtype=np.float64),
+        np.ascontiguousarray(containment, dtype=np.float64)
+    )
+    
+    return score, _RISK_LEVELS[bucket], radius
+
+
+def annotate_ember_risk(features: List[Dict]) -> List[Dict]:
+    """
+    Attach ember risk fields to copies of fire features
+    
+    Args:
+        features: GeoJSON features from a fire perimeter query
+    
+    Returns:
+        New features whose properties include ember_risk_score,
+        ember_risk_level and danger_zone_radius_miles
+    """
+    properties = _properties(features)
+    columns = _fire_columns(properties)
+    acres = _numeric_array(columns['DailyAcres'])
+    containment = _numeric_array(columns['PercentContained'])
+    score, level, radius = score_ember_risk(acres, containment)
+    
+    annotated = []
+    for feature, props, risk_score, risk_level, radius_miles in zip(
+            features, properties, score.tolist(), level.tolist(), radius.tolist()):
+        props = dict(props)
+        props['ember_risk_score'] = risk_score
+        props['ember_risk_level'] = risk_level
+        props['danger_zone_radius_miles'] = radius_miles
+        annotated.append({**feature, 'properties': props})
+    
+    return annotated
@@ -2,22 +2,136 @@
 FastAPI integration example for Fire Perimeter Service
 """
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
-from typing import Optional, List
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
+from typing import Optional, Tuple
+from contextlib import asynccontextmanager
+import asyncio
 import logging
-from datetime import datetime
-from .fire_perimeter_service import FirePerimeterService, FirePerimeterType, AsyncFirePerimeterService
+from datetime import datetime, timezone
+from .fire_perimeter_service import FirePerimeterType, AsyncFirePerimeterService
+from .cache import TTLResponseCache, CacheEntry
+from .analysis import summarize_fires, annotate_ember_risk
+from .spatial import FireSpatialIndex
+from .serialization import iter_geojson_seq, GEOJSON_SEQ_MEDIA_TYPE, ORJSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="EmberAI Fire Perimeter API", version="1.0.0")
+# Upstream perimeters refresh every 15-30 minutes, so serve repeats from memory
+CACHE_TTL_SECONDS = 600
 
-# Initialize services
-fire_service = FirePerimeterService()
-async_fire_service = AsyncFirePerimeterService()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the service and response cache once per worker
+    
+    They live on app.state so the pooled upstream client, the response
+    cache and the spatial indexes derived from it survive across requests
+    """
+    app.state.async_fire_service = AsyncFirePerimeterService()
+    app.state.response_cache = TTLResponseCache(maxsize=256, ttl=CACHE_TTL_SECONDS)
+    app.state.connectivity_refresh = None
+    
+    await app.state.async_fire_service.open()
+    try:
+        yield
+    finally:
+        await app.state.async_fire_service.close()
+
+
+app = FastAPI(title="EmberAI Fire Perimeter API", version="1.0.0",
+              default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# GeoJSON compresses 5-10x; the middleware also sets Vary: Accept-Encoding
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+def get_async_fire_service(request: Request) -> AsyncFirePerimeterService:
+    """Dependency returning the worker's async fire perimeter service"""
+    return request.app.state.async_fire_service
+
+
+def get_response_cache(request: Request) -> TTLResponseCache:
+    """Dependency returning the worker's response cache"""
+    return request.app.state.response_cache
+
+
+async def _get_perimeters_cached(service: AsyncFirePerimeterService,
+                                 cache: TTLResponseCache,
+                                 perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT,
+                                 state_code: Optional[str] = None,
+                                 min_acres: Optional[int] = None,
+                                 max_age_days: Optional[int] = None,
+                                 bbox: Optional[str] = None):
+    """Fetch fire perimeters through the response cache"""
+    key = ("perimeters", perimeter_type, state_code, min_acres, max_age_days, bbox)
+    
+    return await cache.get_or_fetch_async(key, lambda: service.get_fire_perimeters_async(
+        perimeter_type,
+        state_code=state_code,
+        min_acres=min_acres,
+        max_age_days=max_age_days,
+        bbox=bbox
+    ))
+
+
+async def _get_high_priority_cached(service: AsyncFirePerimeterService, cache: TTLResponseCache,
+                                    min_acres: int, max_containment: int, structures_threatened: int,
+                                    state_code: Optional[str] = None, top_k: Optional[int] = None):
+    """Fetch high-priority fires through the response cache"""
+    key = ("high-priority", min_acres, max_containment, structures_threatened, state_code, top_k)
+    
+    return await cache.get_or_fetch_async(key, lambda: service.get_high_priority_fires_async(
+        min_acres=min_acres,
+        max_containment=max_containment,
+        structures_threatened=structures_threatened,
+        state_code=state_code,
+        top_k=top_k
+    ))
+
+
+def _cached_response(request: Request, entry: CacheEntry, cache_hit: bool, response_format: str = "json") -> Response:
+    """
+    Build a response with cache headers, answering 304 when the ETag matches
+    
+    With response_format="geojsonseq" the features are streamed one at a time as a
+    GeoJSON text sequence instead of serializing the whole FeatureCollection
+    """
+    stream = response_format == "geojsonseq"
+    etag = f'"{entry.etag}-seq"' if stream else f'"{entry.etag}"'
+    headers = {
+        "Cache-Control": f"public, max-age={CACHE_TTL_SECONDS}",
+        "ETag": etag,
+        "X-Cache-Hit": "true" if cache_hit else "false"
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    if stream:
+        return StreamingResponse(
+            iter_geojson_seq(entry.data.get('features', [])),
+            media_type=GEOJSON_SEQ_MEDIA_TYPE,
+            headers=headers
+        )
+    
+    # The entry's body was encoded with its ETag, so it is sent without re-encoding
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Parse an 'xmin,ymin,xmax,ymax' query value, rejecting malformed boxes with 400"""
+    try:
+        xmin, ymin, xmax, ymax = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'xmin,ymin,xmax,ymax'")
+    
+    return xmin, ymin, xmax, ymax
 
 
 @app.get("/")
@@ -28,14 +142,19 @@ async def root():
 
 @app.get("/api/fires/current")
 async def get_current_fires(
+    request: Request,
     state: Optional[str] = Query(None, description="Two-letter state code (e.g., 'CA', 'TX')"),
     min_acres: Optional[int] = Query(None, description="Minimum fire size in acres"),
     max_age_days: Optional[int] = Query(None, description="Maximum fire age in days"),
-    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'")
+    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'"),
+    format: str = Query("json", pattern="^(json|geojsonseq)$", description="Response format: 'json' or 'geojsonseq' (GeoJSON text sequence)"),
+    service: AsyncFirePerimeterService = Depends(get_async_fire_service),
+    cache: TTLResponseCache = Depends(get_response_cache)
 ):
     """Get current active fires with optional filtering"""
     try:
-        fires = fire_service.get_fire_perimeters(
+        entry, cache_hit = await _get_perimeters_cached(
+            service, cache,
             perimeter_type=FirePerimeterType.CURRENT,
             state_code=state,
             min_acres=min_acres,
@@ -43,7 +162,7 @@ async def get_current_fires(
             bbox=bbox
         )
         
-        return JSONResponse(content=fires)
+        return _cached_response(request, entry, cache_hit, format)
         
     except Exception as e:
         logger.error(f"Error fetching current fires: {str(e)}")
@@ -52,19 +171,21 @@ async def get_current_fires(
 
 @app.get("/api/fires/high-priority")
 async def get_high_priority_fires(
+    request: Request,
     min_acres: int = Query(1000, description="Minimum fire size in acres"),
     max_containment: int = Query(50, description="Maximum containment percentage"),
-    structures_threatened: int = Query(1, description="Minimum structures threatened")
+    structures_threatened: int = Query(1, description="Minimum structures threatened"),
+    top_k: Optional[int] = Query(None, ge=1, description="Return only the K largest fires"),
+    service: AsyncFirePerimeterService = Depends(get_async_fire_service),
+    cache: TTLResponseCache = Depends(get_response_cache)
 ):
     """Get high-priority fires for ember spotfire analysis"""
     try:
-        fires = fire_service.get_high_priority_fires(
-            min_acres=min_acres,
-            max_containment=max_containment,
-            structures_threatened=structures_threatened
+        entry, cache_hit = await _get_high_priority_cached(
+            service, cache, min_acres, max_containment, structures_threatened, top_k=top_k
         )
         
-        return JSONResponse(content=fires)
+        return _cached_response(request, entry, cache_hit)
         
     except Exception as e:
         logger.error(f"Error fetching high-priority fires: {str(e)}")
@@ -73,19 +194,27 @@ async def get_high_priority_fires(
 
 @app.get("/api/fires/nearby")
 async def get_nearby_fires(
+    request: Request,
     latitude: float = Query(..., description="Latitude in decimal degrees"),
     longitude: float = Query(..., description="Longitude in decimal degrees"),
-    radius_miles: float = Query(50, description="Search radius in miles")
+    radius_miles: float = Query(50, description="Search radius in miles"),
+    service: AsyncFirePerimeterService = Depends(get_async_fire_service),
+    cache: TTLResponseCache = Depends(get_response_cache)
 ):
     """Get fires within a specified radius of coordinates"""
     try:
-        fires = fire_service.get_fires_by_coordinates(
-            latitude=latitude,
-            longitude=longitude,
-            radius_miles=radius_miles
+        # Answer from an index over the cached current fires, rebuilt once per refresh
+        source, cache_hit = await _get_perimeters_cached(service, cache, FirePerimeterType.CURRENT)
+        index = await asyncio.to_thread(
+            source.derive, "spatial_index", lambda: FireSpatialIndex(source.data.get('features', []))
         )
         
-        return JSONResponse(content=fires)
+        fires = {
+            "type": "FeatureCollection",
+            "features": index.query_radius(latitude, longitude, radius_miles)
+        }
+        
+        return _cached_response(request, CacheEntry.from_data(fires), cache_hit)
         
     except Exception as e:
         logger.error(f"Error fetching nearby fires: {str(e)}")
@@ -94,20 +223,29 @@ async def get_nearby_fires(
 
 @app.get("/api/fires/danger-zones")
 async def get_danger_zones(
+    request: Request,
     state: Optional[str] = Query(None, description="Two-letter state code"),
     min_acres: int = Query(500, description="Minimum fire size for danger zone analysis"),
-    wind_speed_threshold: float = Query(15.0, description="Wind speed threshold (mph) for ember transport")
+    wind_speed_threshold: float = Query(15.0, description="Wind speed threshold (mph) for ember transport"),
+    bbox: Optional[str] = Query(None, description="Area of interest 'xmin,ymin,xmax,ymax'"),
+    format: str = Query("json", pattern="^(json|geojsonseq)$", description="Response format: 'json' or 'geojsonseq' (GeoJSON text sequence)"),
+    service: AsyncFirePerimeterService = Depends(get_async_fire_service),
+    cache: TTLResponseCache = Depends(get_response_cache)
 ):
     """
     Get fires that pose ember spotfire danger
     This is a simplified version - in production, you'd integrate with weather data
     """
+    area = _parse_bbox(bbox) if bbox else None
+    
     try:
         # Get fires that are large enough and not fully contained
-        fires = fire_service.get_high_priority_fires(
+        source, cache_hit = await _get_high_priority_cached(
+            service, cache,
             min_acres=min_acres,
             max_containment=80,  # Less than 80% contained
-            structures_threatened=0  # Any structures
+            structures_threatened=0,  # Any structures
+            state_code=state
         )
         
         # In a real implementation, you would:
@@ -116,34 +254,27 @@ async def get_danger_zones(
         # 3. Generate danger zone polygons around fires
         # 4. Return enhanced GeoJSON with danger zones
         
+        if area:
+            # Score only the fires the cached index finds inside the area of interest
+            index = await asyncio.to_thread(
+                source.derive, "spatial_index", lambda: FireSpatialIndex(source.data.get('features', []))
+            )
+            danger_zones = CacheEntry.from_data({
+                **source.data,
+                'features': annotate_ember_risk(index.query_bbox(*area))
+            })
+            
+            return _cached_response(request, danger_zones, cache_hit, format)
+        
         # For now, just return the fires with additional metadata
-        if fires and fires.get('features'):
-            for feature in fires['features']:
-                properties = feature.get('properties', {})
-                
-                # Add ember risk assessment (simplified)
-                acres = properties.get('DailyAcres', 0)
-                containment = properties.get('PercentContained', 0)
-                
-                # Simple risk scoring
-                risk_score = 0
-                if acres > 5000:
-                    risk_score += 3
-                elif acres > 1000:
-                    risk_score += 2
-                else:
-                    risk_score += 1
-                
-                if containment < 25:
-                    risk_score += 2
-                elif containment < 50:
-                    risk_score += 1
-                
-                properties['ember_risk_score'] = risk_score
-                properties['ember_risk_level'] = 'HIGH' if risk_score >= 4 else 'MEDIUM' if risk_score >= 2 else 'LOW'
-                properties['danger_zone_radius_miles'] = min(risk_score * 2, 10)  # Max 10 miles
+        # (scored once per cache refresh, on copies so the ember fields never
+        # leak into the cached payload)
+        danger_zones = source.derive("danger_zones", lambda: CacheEntry.from_data({
+            **source.data,
+            'features': annotate_ember_risk(source.data.get('features', []))
+        }))
         
-        return JSONResponse(content=fires)
+        return _cached_response(request, danger_zones, cache_hit, format)
         
     except Exception as e:
         logger.error(f"Error generating danger zones: {str(e)}")
@@ -152,13 +283,14 @@ async def get_danger_zones(
 
 @app.get("/api/fires/growth-analysis")
 async def get_fire_growth_analysis(
-    days_back: int = Query(7, description="Number of days to analyze for growth patterns")
+    days_back: int = Query(7, description="Number of days to analyze for growth patterns"),
+    service: AsyncFirePerimeterService = Depends(get_async_fire_service)
 ):
     """Analyze fire growth patterns over the specified period"""
     try:
-        analysis = fire_service.get_fire_growth_analysis(days_back=days_back)
+        analysis = await service.get_fire_growth_analysis_async(days_back=days_back)
         
-        return JSONResponse(content=analysis)
+        return ORJSONResponse(content=analysis)
         
     except Exception as e:
         logger.error(f"Error analyzing fire growth: {str(e)}")
@@ -167,20 +299,25 @@ async def get_fire_growth_analysis(
 
 @app.get("/api/fires/historical")
 async def get_historical_fires(
+    request: Request,
     state: Optional[str] = Query(None, description="Two-letter state code"),
     min_acres: Optional[int] = Query(1000, description="Minimum fire size in acres"),
-    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'")
+    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'"),
+    format: str = Query("json", pattern="^(json|geojsonseq)$", description="Response format: 'json' or 'geojsonseq' (GeoJSON text sequence)"),
+    service: AsyncFirePerimeterService = Depends(get_async_fire_service),
+    cache: TTLResponseCache = Depends(get_response_cache)
 ):
     """Get historical fire perimeter data"""
     try:
-        fires = fire_service.get_fire_perimeters(
+        entry, cache_hit = await _get_perimeters_cached(
+            service, cache,
             perimeter_type=FirePerimeterType.HISTORICAL,
             state_code=state,
             min_acres=min_acres,
             bbox=bbox
         )
         
-        return JSONResponse(content=fires)
+        return _cached_response(request, entry, cache_hit, format)
         
     except Exception as e:
         logger.error(f"Error fetching historical fires: {str(e)}")
@@ -188,45 +325,22 @@ async def get_historical_fires(
 
 
 @app.get("/api/fires/stats")
-async def get_fire_statistics():
+async def get_fire_statistics(
+    request: Request,
+    service: AsyncFirePerimeterService = Depends(get_async_fire_service),
+    cache: TTLResponseCache = Depends(get_response_cache)
+):
     """Get summary statistics for current fire activity"""
     try:
         # Get current fires
-        current_fires = fire_service.get_fire_perimeters(FirePerimeterType.CURRENT)
-        
-        # Calculate statistics
-        features = current_fires.get('features', [])
+        source, cache_hit = await _get_perimeters_cached(service, cache, FirePerimeterType.CURRENT)
         
-        if not features:
-            return JSONResponse(content={
-                "total_fires": 0,
-                "total_acres": 0,
-                "avg_acres_per_fire": 0,
-                "states_affected": 0,
-                "largest_fire": None
-            })
+        # Statistics (and their ETag) are computed once per cache refresh
+        stats = source.derive("stats", lambda: CacheEntry.from_data(
+            summarize_fires(source.data.get('features', []))
+        ))
         
-        total_acres = sum(feature.get('properties', {}).get('DailyAcres', 0) for feature in features)
-        states = set(feature.get('properties', {}).get('POOState', '') for feature in features)
-        
-        # Find largest fire
-        largest_fire = max(features, key=lambda x: x.get('properties', {}).get('DailyAcres', 0))
-        largest_fire_info = {
-            "name": largest_fire.get('properties', {}).get('IncidentName', 'Unknown'),
-            "acres": largest_fire.get('properties', {}).get('DailyAcres', 0),
-            "state": largest_fire.get('properties', {}).get('POOState', 'Unknown'),
-            "containment": largest_fire.get('properties', {}).get('PercentContained', 0)
-        }
-        
-        stats = {
-            "total_fires": len(features),
-            "total_acres": total_acres,
-            "avg_acres_per_fire": total_acres / len(features) if features else 0,
-            "states_affected": len(states),
-            "largest_fire": largest_fire_info
-        }
-        
-        return JSONResponse(content=stats)
+        return _cached_response(request, stats, cache_hit)
         
     except Exception as e:
         logger.error(f"Error calculating fire statistics: {str(e)}")
@@ -234,22 +348,55 @@ async def get_fire_statistics():
 
 
 # Health check endpoint
+# Probes are answered from the last successful upstream fetch so that frequent
+# readiness polling does not turn into a stream of NIFC requests
+HEALTH_MAX_AGE_SECONDS = 300
+# Past this age the upstream has been failing for two full cache generations
+HEALTH_DEGRADED_AGE_SECONDS = 2 * CACHE_TTL_SECONDS
+
+
+async def _refresh_connectivity(service: AsyncFirePerimeterService):
+    """Re-check upstream connectivity with a count-only query"""
+    try:
+        await service.get_fire_count_async()
+    except Exception as e:
+        logger.warning(f"Background connectivity check failed: {str(e)}")
+
+
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request, service: AsyncFirePerimeterService = Depends(get_async_fire_service)):
     """Health check endpoint"""
+    state = request.app.state
+    
     try:
-        # Test API connectivity
-        test_fires = fire_service.get_fire_perimeters(FirePerimeterType.CURRENT)
+        age = service.seconds_since_last_success()
+        status = "healthy"
+        api_connectivity = "ok"
+        
+        if age is None:
+            # Cold start: only the first probe reaches the upstream API
+            await service.get_fire_count_async()
+            age = service.seconds_since_last_success()
+        elif age >= HEALTH_MAX_AGE_SECONDS:
+            # Stale: refresh in the background without blocking the probe
+            if state.connectivity_refresh is None or state.connectivity_refresh.done():
+                state.connectivity_refresh = asyncio.create_task(_refresh_connectivity(service))
+            api_connectivity = "refreshing"
+            if age >= HEALTH_DEGRADED_AGE_SECONDS:
+                # Still serving cached data, but the upstream has stopped answering
+                status = "degraded"
+                api_connectivity = "stale"
         
-        return JSONResponse(content={
-            "status": "healthy",
-            "api_connectivity": "ok",
-            "timestamp": fire_service._parse_date(str(int(datetime.now().timestamp() * 1000))).isoformat() if fire_service._parse_date else "unknown"
+        return ORJSONResponse(content={
+            "status": status,
+            "api_connectivity": api_connectivity,
+            "last_upstream_success_seconds": round(age, 1),
+            "timestamp": datetime.now(timezone.utc).isoformat()
         })
         
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
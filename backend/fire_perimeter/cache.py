@@ -0,0 +1,168 @@
+"""
+Response caching for EmberAI fire perimeter data
+Upstream NIFC/WFIGS data only refreshes every 15-30 minutes, so repeated
+queries can be answered from memory instead of a new API round-trip
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from cachetools import TTLCache
+
+from .serialization import encode_json
+
+
+def compute_etag(body: bytes) -> str:
+    """Compute an ETag for an encoded payload"""
+    return hashlib.md5(body).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """A cached payload together with its encoded body, ETag and fetch time"""
+    data: Any
+    etag: str
+    body: bytes = field(repr=False, compare=False)
+    created_at: float = field(default_factory=time.time)
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    
+    @classmethod
+    def from_data(cls, data: Any) -> "CacheEntry":
+        """
+        Build an entry for a payload
+        
+        The payload is encoded once; the same bytes give the ETag and can be
+        sent as-is for pass-through responses
+        """
+        body = encode_json(data)
+        return cls(data=data, etag=compute_etag(body), body=body)
+    
+    def derive(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Compute a value from this entry once and reuse it until the entry expires
+        
+        Args:
+            name: Name of the derived value (e.g. "spatial_index")
+            factory: Callable building the value on first use
+        
+        Returns:
+            The derived value
+        """
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = factory()
+            return self._derived[name]
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical async calls into one in-flight call
+    
+    Callers arriving while a call for the same key is running await that call
+    instead of starting their own, so a burst of identical requests costs one
+    upstream round-trip
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+    
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fetch for a key, or join the call already running for it
+        
+        Args:
+            key: Hashable key identifying identical calls
+            fetch: Callable returning the awaitable to run
+        
+        Returns:
+            The result of the shared call
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        
+        # A cancelled caller must not cancel the call other callers are waiting on
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+
+class TTLResponseCache:
+    """Thread-safe in-process TTL cache for upstream fire perimeter responses"""
+    
+    def __init__(self, maxsize: int = 256, ttl: float = 600):
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+    
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any],
+                     refresh: bool = False) -> Tuple[CacheEntry, bool]:
+        """
+        Return the cached entry for a key, fetching it on a miss
+        
+        Args:
+            key: Hashable cache key, typically the tuple of query parameters
+            fetch: Callable returning the payload on a cache miss
+            refresh: Skip the cached entry and store a fresh fetch in its place
+        
+        Returns:
+            Tuple of (cache entry, whether it was a cache hit)
+        """
+        with self._lock:
+            entry = None if refresh else self._cache.get(key)
+        
+        if entry is not None:
+            return entry, True
+        
+        # Fetch outside the lock so a slow upstream call does not block hits
+        entry = CacheEntry.from_data(fetch())
+        
+        with self._lock:
+            self._cache[key] = entry
+        
+        return entry, False
+    
+    async def get_or_fetch_async(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                                 refresh: bool = False) -> Tuple[CacheEntry, bool]:
+        """
+        Async version of get_or_fetch for coroutine-based fetches
+        
+        Concurrent misses for the same key share a single fetch
+        
+        Args:
+            key: Hashable cache key, typically the tuple of query parameters
+            fetch: Callable returning an awaitable payload on a cache miss
+            refresh: Skip the cached entry and store a fresh fetch in its place
+        
+        Returns:
+            Tuple of (cache entry, whether it was a cache hit)
+        """
+        with self._lock:
+            entry = None if refresh else self._cache.get(key)
+        
+        if entry is not None:
+            return entry, True
+        
+        async def fetch_entry() -> CacheEntry:
+            # Encoding and hashing a multi-MB payload would stall the event loop
+            fetched = await asyncio.to_thread(CacheEntry.from_data, await fetch())
+            with self._lock:
+                self._cache[key] = fetched
+            return fetched
+        
+        return await self._flights.do(key, fetch_entry), False
+    
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        with self._lock:
+            self._cache.clear()
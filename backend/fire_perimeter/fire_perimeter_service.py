@@ -3,22 +3,137 @@ Fire Perimeter Service for EmberAI
 Handles ingestion of fire perimeter data from NIFC/WFIGS APIs
 """
 
-import requests
+import hashlib
+import httpx
 import json
 import logging
-from typing import Dict, List, Optional, Union
-from datetime import datetime, timedelta
-from dataclasses import dataclass
+import re
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Union
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+from dataclasses import dataclass, fields
 from enum import Enum
 import asyncio
-import aiohttp
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import quote_plus
+
+import ijson
+import numpy as np
+import orjson
+import pandas as pd
+import zstandard
+
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
+try:
+    import redis
+except ImportError:  # the Redis cache tier is optional
+    redis = None
+
+from .spatial import FireSpatialIndex, RaggedGeometry, bbox_around, filter_within_radius, snap_bbox, split_bbox
+from .serialization import esri_to_geojson_feature
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def run_async(main):
+    """
+    Run a coroutine to completion, on uvloop when it is installed
+    
+    uvloop runs the event loop in libuv, which lowers the per-request overhead
+    of the concurrent query fan-outs in AsyncFirePerimeterService
+    
+    Args:
+        main: Coroutine to run
+    
+    Returns:
+        The coroutine's result
+    """
+    if uvloop is None:
+        return asyncio.run(main)
+    if sys.version_info >= (3, 12):
+        return asyncio.run(main, loop_factory=uvloop.new_event_loop)
+    
+    uvloop.install()
+    return asyncio.run(main)
+
+
+# Whole-string match for epoch-millisecond timestamps sent as text
+_EPOCH_MS_RE = re.compile(r'[0-9]+')
+
+
+def _parse_epoch_ms(value: Union[str, int, float]) -> datetime:
+    """Convert epoch milliseconds to a UTC datetime"""
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+
+
+def _parse_date_text(value: str) -> datetime:
+    """Parse a date string holding either epoch milliseconds or ISO 8601"""
+    if _EPOCH_MS_RE.fullmatch(value):
+        return _parse_epoch_ms(value)
+    if value.endswith('Z'):
+        # fromisoformat only accepts a 'Z' suffix from Python 3.11
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+
+# Parser per raw value type, so each value takes a single dispatch
+_DATE_PARSERS = {
+    int: _parse_epoch_ms,
+    float: _parse_epoch_ms,
+    str: _parse_date_text
+}
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_cached(date_value: Union[str, int, float]) -> Optional[datetime]:
+    """
+    Parse a date value from an API response, memoized because many features
+    in one FeatureCollection share the same timestamp
+    
+    Bulk parsing in FirePerimeterArray uses pandas instead; this is the
+    scalar fallback behind _parse_date
+    
+    Args:
+        date_value: Epoch milliseconds (as a number or digit string) or ISO 8601 string
+    
+    Returns:
+        Timezone-aware UTC datetime, or None if the value cannot be parsed
+    """
+    parser = _DATE_PARSERS.get(type(date_value))
+    
+    try:
+        if parser is None:
+            raise TypeError(f"unsupported date type {type(date_value).__name__}")
+        return parser(date_value)
+    except (ValueError, TypeError, OverflowError, OSError):
+        logger.warning(f"Could not parse date: {date_value}")
+        return None
+
+
+@lru_cache(maxsize=256)
+def _query_prefix(endpoint: str, out_fields: str) -> str:
+    """Pre-encoded start of every query URL for an endpoint and field list"""
+    return f"{endpoint}?outFields={quote_plus(out_fields)}&"
+
+
+def _sql_literal(value: Union[str, int, float]) -> str:
+    """Render a value for an ArcGIS WHERE clause, quoting strings and escaping embedded quotes"""
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+
 class FirePerimeterType(Enum):
     """Types of fire perimeter data available"""
     CURRENT = "current"
@@ -27,12 +142,16 @@ class FirePerimeterType(Enum):
     HISTORICAL = "historical"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FirePerimeter:
-    """Data class for fire perimeter information"""
+    """Data class for fire perimeter information
+    
+    Slotted and immutable: thousands of fires are held at once, and slots
+    drop the per-instance __dict__
+    """
     incident_id: str
     incident_name: str
-    geometry: Dict
+    geometry: Optional[RaggedGeometry]
     acres: float
     containment_percent: int
     discovery_date: datetime
@@ -54,15 +173,25 @@ class FirePerimeter:
     fuel_model: str
     fire_danger_rating: str
     
+    @classmethod
+    def _make(cls, values: Iterable) -> "FirePerimeter":
+        """Create a FirePerimeter from values in field order, skipping keyword matching"""
+        return cls(*values)
+    
+    @property
+    def bounds(self) -> Optional[tuple]:
+        """Perimeter bounding box as (xmin, ymin, xmax, ymax), or None without geometry"""
+        return self.geometry.bounds if self.geometry is not None else None
+    
     def to_dict(self) -> Dict:
-        """Convert to dictionary for JSON serialization"""
+        """Convert to dictionary for orjson serialization (discovery_date stays a datetime)"""
         return {
             "incident_id": self.incident_id,
             "incident_name": self.incident_name,
-            "geometry": self.geometry,
+            "geometry": self.geometry.to_geojson() if self.geometry is not None else None,
             "acres": self.acres,
             "containment_percent": self.containment_percent,
-            "discovery_date": self.discovery_date.isoformat() if self.discovery_date else None,
+            "discovery_date": self.discovery_date,
             "state": self.state,
             "county": self.county,
             "fire_cause": self.fire_cause,
@@ -83,8 +212,301 @@ class FirePerimeter:
         }
 
 
-class FirePerimeterService:
-    """Service for fetching fire perimeter data from NIFC/WFIGS APIs"""
+# FirePerimeter field names in positional (_make) order
+_PERIMETER_FIELDS = tuple(f.name for f in fields(FirePerimeter))
+
+# FirePerimeter fields filled from NIFC properties, grouped by the cast applied
+_FLOAT_FIELDS = {
+    'acres': 'DailyAcres',
+    'poi_latitude': 'InitialLatitude',
+    'poi_longitude': 'InitialLongitude',
+    'initial_response_acres': 'InitialResponseAcres',
+    'estimated_cost': 'EstimatedCostToDate'
+}
+_INT_FIELDS = {
+    'containment_percent': 'PercentContained',
+    'total_personnel': 'TotalPersonnel',
+    'structures_threatened': 'StructuresThreated',
+    'structures_destroyed': 'StructuresDestroyed'
+}
+_STR_FIELDS = {
+    'incident_id': 'IRWINID',
+    'incident_name': 'IncidentName',
+    'state': 'POOState',
+    'county': 'POOCounty',
+    'fire_cause': 'FireCause',
+    'fire_behavior': 'FireBehaviorGeneral',
+    'suppression_method': 'SuppressionMethod',
+    'fire_management_complexity': 'FireMgmtComplexity',
+    'fire_origin': 'FireOrigin',
+    'weather_concerns': 'WeatherConcerns',
+    'fuel_model': 'FuelModel',
+    'fire_danger_rating': 'FireDangerRating'
+}
+
+# NIFC properties requested from the WFIGS layers instead of outFields=*: the
+# ones FirePerimeter is built from (see the mappings above) that appear in the
+# layers' published schema, plus those used by the analysis helpers, the demos
+# and async paging. ArcGIS rejects a query naming a field the layer lacks, so
+# mapped fields missing from the schema are left out and keep their defaults
+_WFIGS_FIELDS = (
+    'OBJECTID',
+    'FireDiscoveryDateTime',
+    'GISAcres',
+    'DailyAcres',
+    'InitialLatitude',
+    'InitialLongitude',
+    'InitialResponseAcres',
+    'EstimatedCostToDate',
+    'PercentContained',
+    'TotalPersonnel',
+    'StructuresDestroyed',
+    'IRWINID',
+    'IncidentName',
+    'POOState',
+    'POOCounty',
+    'FireCause',
+    'FireBehaviorGeneral',
+    'FireMgmtComplexity'
+)
+
+# Default field list per layer; layers whose schema has not been checked
+# against the list (the certified and historical archives) get every field
+_LAYER_FIELDS = {
+    FirePerimeterType.CURRENT: _WFIGS_FIELDS,
+    FirePerimeterType.YEAR_TO_DATE: _WFIGS_FIELDS
+}
+
+
+def _out_fields(perimeter_type: FirePerimeterType, extra_fields: Optional[Iterable[str]] = None) -> str:
+    """outFields value for a layer's default fields plus any extras ('*' requests every field)"""
+    layer_fields = _LAYER_FIELDS.get(perimeter_type)
+    extra_fields = tuple(extra_fields or ())
+    if layer_fields is None or '*' in extra_fields:
+        return '*'
+    return ','.join(dict.fromkeys(layer_fields + extra_fields))
+
+
+def _property_column(props_df: pd.DataFrame, name: str) -> pd.Series:
+    """Get one property column, or an all-missing column if no feature has it"""
+    if name in props_df.columns:
+        return props_df[name]
+    return pd.Series([None] * len(props_df), index=props_df.index, dtype=object)
+
+
+def _parse_date_column(values: pd.Series) -> List[Optional[datetime]]:
+    """
+    Parse a column of API dates in bulk
+    
+    Args:
+        values: Epoch milliseconds (numbers or digit strings) and/or ISO 8601 strings
+    
+    Returns:
+        Timezone-aware UTC datetimes, None where a value is missing or unparseable
+    """
+    epoch_ms = pd.to_numeric(values, errors='coerce')
+    dates = pd.to_datetime(epoch_ms, unit='ms', utc=True, errors='coerce')
+    
+    iso_strings = values.where(epoch_ms.isna() & values.notna())
+    if iso_strings.notna().any():
+        dates = dates.fillna(pd.to_datetime(iso_strings, utc=True, errors='coerce', format='ISO8601'))
+    
+    return [None if pd.isna(date) else date.to_pydatetime() for date in dates]
+
+
+def _to_float(value) -> float:
+    """Scalar counterpart of the pandas float cast: unparseable or missing values become 0"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(value) else value
+
+
+def _to_int(value) -> int:
+    """Scalar counterpart of the pandas int cast, truncating like astype(int64)"""
+    value = _to_float(value)
+    return int(value) if math.isfinite(value) else 0
+
+
+def _to_str(value):
+    """Scalar counterpart of the pandas text cast: missing values become ''"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return value
+
+
+def _to_date(value) -> Optional[datetime]:
+    """Scalar counterpart of _parse_date_column"""
+    return _parse_date_cached(value) if value is not None else None
+
+
+def _fire_field_casts() -> tuple:
+    """
+    (NIFC property, cast, default) per FirePerimeter field, in positional order
+    
+    The geometry slot has no property; it is passed to _build_fire separately
+    """
+    casts = {'discovery_date': ('FireDiscoveryDateTime', _to_date, None)}
+    casts.update((name, (prop, _to_float, 0.0)) for name, prop in _FLOAT_FIELDS.items())
+    casts.update((name, (prop, _to_int, 0)) for name, prop in _INT_FIELDS.items())
+    casts.update((name, (prop, _to_str, '')) for name, prop in _STR_FIELDS.items())
+    
+    return tuple((None, None, None) if name == 'geometry' else casts[name] for name in _PERIMETER_FIELDS)
+
+
+_FIRE_FIELD_CASTS = _fire_field_casts()
+
+
+def _build_fire(props: Dict, geometry: Optional[RaggedGeometry]) -> FirePerimeter:
+    """
+    Build one FirePerimeter from a feature's properties
+    
+    Casts match FirePerimeterArray; missing properties take the field default
+    without going through the cast
+    
+    Args:
+        props: GeoJSON feature properties
+        geometry: Already converted perimeter geometry
+    
+    Returns:
+        FirePerimeter for the feature
+    """
+    return FirePerimeter._make(
+        geometry if prop is None else (cast(props[prop]) if prop in props else default)
+        for prop, cast, default in _FIRE_FIELD_CASTS
+    )
+
+# Below this many features (about one layer page), building fires one by one
+# with _build_fire beats the fixed DataFrame setup cost of FirePerimeterArray
+_SCALAR_PARSE_LIMIT = 2000
+
+
+def _parse_features(features: List[Dict]) -> List[FirePerimeter]:
+    """
+    Parse GeoJSON features with whichever path is faster for the batch size
+    
+    Args:
+        features: GeoJSON features from a fire perimeter query
+    
+    Returns:
+        FirePerimeter objects in feature order
+    """
+    if len(features) < _SCALAR_PARSE_LIMIT:
+        return [
+            _build_fire(feature.get('properties') or {}, RaggedGeometry.from_geojson(feature.get('geometry')))
+            for feature in features
+        ]
+    
+    return list(FirePerimeterArray.from_features(features))
+
+
+class FirePerimeterArray:
+    """
+    Column-oriented fire perimeters
+    
+    Properties are cast column by column with vectorized pandas conversions
+    instead of ~20 per-feature lookups and casts; FirePerimeter objects are
+    only built when indexed or iterated. Geometries are flattened into
+    RaggedGeometry buffers so the nested coordinate lists can be released
+    """
+    
+    def __init__(self, columns: Dict[str, np.ndarray], discovery_dates: List[Optional[datetime]],
+                 geometries: List[Optional[RaggedGeometry]]):
+        self.columns = columns
+        self.discovery_dates = discovery_dates
+        self.geometries = geometries
+    
+    @classmethod
+    def from_features(cls, features: Iterable[Dict]) -> "FirePerimeterArray":
+        """
+        Build the column arrays from GeoJSON features
+        
+        Args:
+            features: GeoJSON features from a fire perimeter query
+        
+        Returns:
+            FirePerimeterArray with one entry per feature; missing or
+            non-numeric values become 0 and missing text becomes ''
+        """
+        features = list(features)
+        props_df = pd.DataFrame.from_records(
+            [feature.get('properties') or {} for feature in features],
+            index=pd.RangeIndex(len(features))
+        )
+        
+        columns = {}
+        for field_name, name in _FLOAT_FIELDS.items():
+            values = pd.to_numeric(_property_column(props_df, name), errors='coerce')
+            columns[field_name] = values.fillna(0).to_numpy(dtype=np.float64)
+        
+        for field_name, name in _INT_FIELDS.items():
+            values = pd.to_numeric(_property_column(props_df, name), errors='coerce')
+            columns[field_name] = values.fillna(0).to_numpy(dtype=np.float64).astype(np.int64)
+        
+        for field_name, name in _STR_FIELDS.items():
+            values = _property_column(props_df, name).astype(object)
+            columns[field_name] = values.where(values.notna(), '').to_numpy(dtype=object)
+        
+        return cls(
+            columns=columns,
+            discovery_dates=_parse_date_column(_property_column(props_df, 'FireDiscoveryDateTime')),
+            geometries=[RaggedGeometry.from_geojson(feature.get('geometry')) for feature in features]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.geometries)
+    
+    def __getitem__(self, index: int) -> FirePerimeter:
+        extras = {
+            'geometry': self.geometries[index],
+            'discovery_date': self.discovery_dates[index]
+        }
+        
+        return FirePerimeter._make(
+            extras[name] if name in extras else self.columns[name].item(index)
+            for name in _PERIMETER_FIELDS
+        )
+    
+    def __iter__(self) -> Iterator[FirePerimeter]:
+        # Convert each column to Python scalars once rather than per element,
+        # then build every FirePerimeter positionally
+        extras = {
+            'geometry': self.geometries,
+            'discovery_date': self.discovery_dates
+        }
+        values = [
+            extras[name] if name in extras else self.columns[name].tolist()
+            for name in _PERIMETER_FIELDS
+        ]
+        
+        return map(FirePerimeter._make, zip(*values))
+
+class _BaseFirePerimeterService:
+    """Endpoint and query construction shared by the sync and async services"""
+    
+    # WHERE clause fragment per filter; values are rendered with _sql_literal
+    _WHERE_TEMPLATES = {
+        'state_code': "POOState={}",
+        'min_acres': "DailyAcres >= {}",
+        'max_age_days': "FireDiscoveryDateTime >= {}",
+        'max_containment': "PercentContained <= {}",
+        'structures_threatened': "StructuresThreated >= {}"
+    }
+    _DEFAULT_PARAMS = {
+        'where': '1=1',
+        'f': 'geojson'
+    }
+    
+    # Server-side aggregates behind get_statistics
+    _TOTAL_STATISTICS = [
+        {"statisticType": "count", "onStatisticField": "OBJECTID", "outStatisticFieldName": "total_fires"},
+        {"statisticType": "sum", "onStatisticField": "DailyAcres", "outStatisticFieldName": "total_acres"}
+    ]
+    _STATE_STATISTICS = [
+        {"statisticType": "count", "onStatisticField": "OBJECTID", "outStatisticFieldName": "fire_count"}
+    ]
+    _LARGEST_FIRE_FIELDS = 'IncidentName,DailyAcres,POOState,PercentContained'
     
     def __init__(self):
         self.base_url = "https://services3.arcgis.com/T4QMspbfLg3qTGWY/ArcGIS/rest/services"
@@ -94,17 +516,317 @@ class FirePerimeterService:
             FirePerimeterType.CERTIFIED: f"{self.base_url}/WFIGS_Interagency_Perimeters_Certified/FeatureServer/0/query",
             FirePerimeterType.HISTORICAL: f"{self.base_url}/InterAgencyFirePerimeterHistory_All_Years_View/FeatureServer/0/query"
         }
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'EmberAI-FirePerimeter-Service/1.0'
-        })
+        self._last_ok_ts: Optional[float] = None
+    
+    def _mark_upstream_ok(self) -> None:
+        """Record a successful upstream fetch"""
+        self._last_ok_ts = time.monotonic()
+    
+    def seconds_since_last_success(self) -> Optional[float]:
+        """Seconds since the last successful upstream fetch, or None if there has been none"""
+        if self._last_ok_ts is None:
+            return None
+        return time.monotonic() - self._last_ok_ts
+    
+    def _build_query_params(self, 
+                          bbox: Optional[str] = None,
+                          state_code: Optional[str] = None,
+                          min_acres: Optional[int] = None,
+                          max_age_days: Optional[int] = None,
+                          max_containment: Optional[int] = None,
+                          structures_threatened: Optional[int] = None,
+                          extra_fields: Optional[Iterable[str]] = None,
+                          out_fields: Optional[Iterable[str]] = None,
+                          return_geometry: bool = True,
+                          where: Optional[str] = None,
+                          perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT) -> Dict:
+        """
+        Build query parameters for API request, pushing every filter to the server
+        
+        out_fields replaces the layer's default field list outright, for callers
+        that only read a few properties; where is ANDed with the filter conditions
+        """
+        cutoff_date = None
+        if max_age_days:
+            cutoff_date = (datetime.now() - timedelta(days=max_age_days)).strftime("%Y-%m-%d")
+        
+        filters = {
+            'state_code': state_code.upper() if state_code else None,
+            'min_acres': min_acres or None,
+            'max_age_days': cutoff_date,
+            'max_containment': max_containment,
+            'structures_threatened': structures_threatened or None
+        }
+        where_conditions = [
+            self._WHERE_TEMPLATES[name].format(_sql_literal(value))
+            for name, value in filters.items()
+            if value is not None
+        ]
+        if where:
+            where_conditions.append(f"({where})")
+        
+        params = self._DEFAULT_PARAMS.copy()
+        params['outFields'] = ','.join(out_fields) if out_fields else _out_fields(perimeter_type, extra_fields)
+        if where_conditions:
+            params['where'] = ' AND '.join(where_conditions)
+        if not return_geometry:
+            params['returnGeometry'] = 'false'
+        
+        if bbox:
+            params['geometry'] = bbox
+            params['geometryType'] = 'esriGeometryEnvelope'
+            params['spatialRel'] = 'esriSpatialRelIntersects'
+            params['inSR'] = '4326'  # bbox is WGS84, not the layer's native reference
+        
+        return params
+    
+    def _build_high_priority_params(self, 
+                                  min_acres: int = 1000,
+                                  max_containment: int = 50,
+                                  structures_threatened: int = 1,
+                                  state_code: Optional[str] = None,
+                                  top_k: Optional[int] = None) -> Dict:
+        """Build query parameters for the high-priority fire query, largest fires first"""
+        params = self._build_query_params(
+            state_code=state_code,
+            min_acres=min_acres,
+            max_containment=max_containment,
+            structures_threatened=structures_threatened
+        )
+        params['orderByFields'] = 'DailyAcres DESC'
+        
+        if top_k is not None:
+            # Let the server return only the K largest fires
+            params['resultRecordCount'] = top_k
+        
+        return params
+    
+    def _build_statistics_params(self, **filters) -> Dict[str, Dict]:
+        """
+        Build the queries get_statistics aggregates on the server
+        
+        Args:
+            **filters: Query filters accepted by _build_query_params
+        
+        Returns:
+            Query parameters for the totals, per-state counts and largest fire
+        """
+        params = self._build_query_params(**filters, return_geometry=False)
+        params['f'] = 'json'
+        
+        return {
+            'totals': {
+                **params,
+                'outFields': '',
+                'outStatistics': orjson.dumps(self._TOTAL_STATISTICS).decode()
+            },
+            'states': {
+                **params,
+                'outFields': 'POOState',
+                'outStatistics': orjson.dumps(self._STATE_STATISTICS).decode(),
+                'groupByFieldsForStatistics': 'POOState'
+            },
+            'largest': {
+                **params,
+                'outFields': self._LARGEST_FIRE_FIELDS,
+                'orderByFields': 'DailyAcres DESC',
+                'resultRecordCount': 1
+            }
+        }
+    
+    def _compose_statistics(self, results: Dict[str, Dict]) -> Dict:
+        """
+        Combine the statistics query results into one summary
+        
+        Args:
+            results: Esri JSON responses keyed like _build_statistics_params
+        
+        Returns:
+            Totals, averages, affected state count and the largest fire
+        """
+        totals = (results['totals'].get('features') or [{}])[0].get('attributes') or {}
+        total_fires = int(totals.get('total_fires') or 0)
+        total_acres = float(totals.get('total_acres') or 0)
+        
+        largest_fire = None
+        largest = results['largest'].get('features')
+        if largest:
+            props = largest[0].get('attributes') or {}
+            largest_fire = {
+                "name": props.get('IncidentName', 'Unknown'),
+                "acres": props.get('DailyAcres', 0),
+                "state": props.get('POOState', 'Unknown'),
+                "containment": props.get('PercentContained', 0)
+            }
+        
+        return {
+            "total_fires": total_fires,
+            "total_acres": total_acres,
+            "avg_acres_per_fire": total_acres / total_fires if total_fires else 0,
+            "states_affected": len(results['states'].get('features', [])),
+            "largest_fire": largest_fire
+        }
+    
+    def _query_url(self, endpoint: str, params: Dict) -> str:
+        """
+        Build a fully encoded query URL
+        
+        Args:
+            endpoint: Layer query endpoint
+            params: Query parameters from _build_query_params
+        
+        Returns:
+            The endpoint's static prefix followed by the encoded variable parameters
+        """
+        return _query_prefix(endpoint, params.get('outFields', '*')) + '&'.join(
+            f"{name}={quote_plus(str(value))}" for name, value in params.items() if name != 'outFields'
+        )
+    
+    def _bbox_around(self, latitude: float, longitude: float, radius_miles: float) -> str:
+        """Build a bounding box string around coordinates"""
+        return ','.join(str(value) for value in bbox_around(latitude, longitude, radius_miles))
+    
+    def _analyze_fire_growth(self, current_fires: Dict, historical_fires: Dict, start_date: datetime) -> Dict:
+        """Analyze fire growth patterns"""
+        # This is a placeholder for more sophisticated growth analysis
+        # In a real implementation, you would compare fire sizes over time
+        
+        current_count = len(current_fires.get('features', []))
+        historical_count = len(historical_fires.get('features', []))
+        
+        return {
+            "analysis_date": datetime.now().isoformat(),
+            "current_active_fires": current_count,
+            "total_ytd_fires": historical_count,
+            "growth_rate": "Analysis placeholder - implement detailed growth tracking",
+            "high_growth_fires": [],
+            "ember_risk_fires": []
+        }
+
+
+class FirePerimeterService(_BaseFirePerimeterService):
+    """Service for fetching fire perimeter data from NIFC/WFIGS APIs
+    
+    Args:
+        cache: Optional Redis client; query responses are then cached
+            zstd-compressed under a hash of (endpoint, params)
+        cache_ttl: Seconds a cached response is served; NIFC refreshes
+            perimeters every 15-30 minutes
+    """
+    
+    # Grid that bounding boxes are snapped to when a cache is configured
+    BBOX_GRID_DEGREES = 0.1
+    
+    # Features parsed together when parsing lazily
+    PARSE_BATCH_SIZE = 1000
+    
+    # Transient upstream failures are retried with exponential backoff
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.3
+    
+    def __init__(self, cache: Optional["redis.Redis"] = None, cache_ttl: int = 900):
+        super().__init__()
+        if cache is not None and redis is None:
+            logger.warning("redis is not installed; disabling the Redis cache tier")
+            cache = None
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        
+        # Every layer is served from the same ArcGIS host, so HTTP/2 multiplexes
+        # concurrent queries (e.g. _fetch_many) over one pooled connection;
+        # the transport also retries failed connection attempts
+        transport = httpx.HTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+            retries=self.MAX_RETRIES
+        )
+        self.client = httpx.Client(
+            transport=transport,
+            timeout=30.0,
+            headers={'User-Agent': 'EmberAI-FirePerimeter-Service/1.0'}
+        )
+    
+    def close(self) -> None:
+        """Close the pooled HTTP client"""
+        self.client.close()
+    
+    def _send(self, url: str, stream: bool = False) -> httpx.Response:
+        """
+        GET a URL, retrying RETRY_STATUSES responses with backoff
+        
+        Args:
+            url: Fully encoded query URL
+            stream: Leave the body unread; the caller must close the response
+        
+        Returns:
+            The final response, whatever its status
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            response = self.client.send(self.client.build_request('GET', url), stream=stream)
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                return response
+            
+            response.close()
+            time.sleep(self.RETRY_BACKOFF * 2 ** attempt)
+    
+    def _cache_key(self, endpoint: str, params: Dict) -> str:
+        """Hash an upstream query into a Redis key"""
+        digest = hashlib.blake2b(
+            endpoint.encode() + orjson.dumps(params, option=orjson.OPT_SORT_KEYS),
+            digest_size=16
+        ).hexdigest()
+        return f"emberai:fires:{digest}"
+    
+    def _get_json(self, endpoint: str, params: Dict) -> Dict:
+        """
+        Run a query, serving repeats from the Redis cache when one is configured
+        
+        Args:
+            endpoint: Layer query endpoint
+            params: Query parameters from _build_query_params
+        
+        Returns:
+            Decoded JSON response
+        """
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(endpoint, params)
+            try:
+                cached = self.cache.get(key)
+            except redis.RedisError as e:
+                logger.warning(f"Redis cache read failed: {str(e)}")
+                cached = None
+            
+            if cached is not None:
+                return orjson.loads(zstandard.ZstdDecompressor().decompress(cached))
+        
+        response = self._send(self._query_url(endpoint, params))
+        response.raise_for_status()
+        
+        # orjson parses the raw bytes directly, skipping the text decode and stdlib json
+        data = orjson.loads(response.content)
+        self._mark_upstream_ok()
+        
+        if key is not None:
+            try:
+                self.cache.setex(key, self.cache_ttl, zstandard.ZstdCompressor(level=3).compress(response.content))
+            except redis.RedisError as e:
+                logger.warning(f"Redis cache write failed: {str(e)}")
+        
+        return data
     
     def get_fire_perimeters(self, 
                           perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT,
                           bbox: Optional[str] = None,
                           state_code: Optional[str] = None,
                           min_acres: Optional[int] = None,
-                          max_age_days: Optional[int] = None) -> Dict:
+                          max_age_days: Optional[int] = None,
+                          max_containment: Optional[int] = None,
+                          extra_fields: Optional[Iterable[str]] = None,
+                          out_fields: Optional[Iterable[str]] = None,
+                          return_geometry: bool = True,
+                          where: Optional[str] = None) -> Dict:
         """
         Get fire perimeters with various filtering options
         
@@ -114,27 +836,103 @@ class FirePerimeterService:
             state_code: Two-letter state code (e.g., 'CA', 'CO')
             min_acres: Minimum fire size in acres
             max_age_days: Maximum age of fires in days
+            max_containment: Maximum containment percentage
+            extra_fields: Properties to request beyond the layer's defaults ('*' for all)
+            out_fields: Exact properties to request instead of the layer's defaults
+            return_geometry: Whether to include perimeter geometries
+            where: Additional ArcGIS WHERE clause ANDed with the filters
         
         Returns:
             GeoJSON FeatureCollection of fire perimeters
         """
         try:
             endpoint = self.endpoints[perimeter_type]
-            params = self._build_query_params(bbox, state_code, min_acres, max_age_days)
+            params = self._build_query_params(bbox, state_code, min_acres, max_age_days, max_containment,
+                                              extra_fields=extra_fields, out_fields=out_fields,
+                                              return_geometry=return_geometry, where=where,
+                                              perimeter_type=perimeter_type)
             
             logger.info(f"Fetching {perimeter_type.value} fire perimeters")
-            response = self.session.get(endpoint, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get_json(endpoint, params)
             logger.info(f"Retrieved {len(data.get('features', []))} fire perimeters")
             
             return data
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error fetching fire perimeters: {str(e)}")
             raise
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
+            logger.error(f"Error parsing JSON response: {str(e)}")
+            raise
+    
+    def iter_fire_perimeters(self, 
+                             perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT,
+                             bbox: Optional[str] = None,
+                             state_code: Optional[str] = None,
+                             min_acres: Optional[int] = None,
+                             max_age_days: Optional[int] = None,
+                             max_containment: Optional[int] = None,
+                             extra_fields: Optional[Iterable[str]] = None,
+                             out_fields: Optional[Iterable[str]] = None,
+                             return_geometry: bool = True,
+                             where: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream fire perimeter features as they arrive
+        
+        Historical and year-to-date responses can be tens of MB of polygon
+        coordinates; parsing them incrementally keeps memory at roughly one
+        feature instead of the whole response
+        
+        Args:
+            perimeter_type: Type of perimeter data to fetch
+            bbox: Bounding box filter "xmin,ymin,xmax,ymax" (WGS84)
+            state_code: Two-letter state code (e.g., 'CA', 'CO')
+            min_acres: Minimum fire size in acres
+            max_age_days: Maximum age of fires in days
+            max_containment: Maximum containment percentage
+            extra_fields: Properties to request beyond the layer's defaults ('*' for all)
+            out_fields: Exact properties to request instead of the layer's defaults
+            return_geometry: Whether to include perimeter geometries
+            where: Additional ArcGIS WHERE clause ANDed with the filters
+        
+        Yields:
+            GeoJSON features of the FeatureCollection
+        """
+        try:
+            endpoint = self.endpoints[perimeter_type]
+            params = self._build_query_params(bbox, state_code, min_acres, max_age_days, max_containment,
+                                              extra_fields=extra_fields, out_fields=out_fields,
+                                              return_geometry=return_geometry, where=where,
+                                              perimeter_type=perimeter_type)
+            
+            logger.info(f"Streaming {perimeter_type.value} fire perimeters")
+            response = self._send(self._query_url(endpoint, params), stream=True)
+            try:
+                response.raise_for_status()
+                
+                # Push decoded chunks into ijson and yield the features each one completes
+                count = 0
+                features = ijson.sendable_list()
+                parser = ijson.items_coro(features, 'features.item', use_float=True)
+                for chunk in response.iter_bytes():
+                    parser.send(chunk)
+                    count += len(features)
+                    yield from features
+                    del features[:]
+                
+                parser.close()
+                count += len(features)
+                yield from features
+            finally:
+                response.close()
+            
+            self._mark_upstream_ok()
+            logger.info(f"Streamed {count} fire perimeters")
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Error streaming fire perimeters: {str(e)}")
+            raise
+        except ijson.JSONError as e:
             logger.error(f"Error parsing JSON response: {str(e)}")
             raise
     
@@ -153,52 +951,46 @@ class FirePerimeterService:
             perimeter_type: Type of perimeter data to fetch
         
         Returns:
-            GeoJSON FeatureCollection of nearby fire perimeters
+            GeoJSON FeatureCollection of fires whose point of origin is within the radius
         """
-        # Convert miles to degrees (approximate)
-        degree_radius = radius_miles / 69.0  # 1 degree ≈ 69 miles
+        if self.cache is not None:
+            # Snap to a grid so nearby searches share cache entries
+            bbox = ','.join(str(value) for value in snap_bbox(
+                *bbox_around(latitude, longitude, radius_miles), self.BBOX_GRID_DEGREES
+            ))
+        else:
+            bbox = self._bbox_around(latitude, longitude, radius_miles)
         
-        bbox = f"{longitude - degree_radius},{latitude - degree_radius},{longitude + degree_radius},{latitude + degree_radius}"
+        data = self.get_fire_perimeters(perimeter_type, bbox=bbox)
         
-        return self.get_fire_perimeters(perimeter_type, bbox=bbox)
+        # The bbox is only a prefilter; trim it to the true radius
+        return {**data, 'features': filter_within_radius(data.get('features', []), latitude, longitude, radius_miles)}
     
     def get_high_priority_fires(self, 
                               min_acres: int = 1000,
                               max_containment: int = 50,
-                              structures_threatened: int = 1) -> Dict:
+                              structures_threatened: int = 1,
+                              state_code: Optional[str] = None,
+                              top_k: Optional[int] = None) -> Dict:
         """
         Get high-priority fires for ember spotfire analysis
         
         Args:
             min_acres: Minimum fire size in acres
             max_containment: Maximum containment percentage
-            structures_threatened: Minimum structures threatened
+            structures_threatened: Minimum structures threatened (0 for any)
+            state_code: Optional two-letter state code
+            top_k: Optional limit to the K largest fires, applied by the server
         
         Returns:
-            GeoJSON FeatureCollection of high-priority fires
+            GeoJSON FeatureCollection of high-priority fires, largest first
         """
         try:
             endpoint = self.endpoints[FirePerimeterType.CURRENT]
-            
-            # Build complex where clause for high-priority fires
-            where_conditions = [
-                f"DailyAcres >= {min_acres}",
-                f"PercentContained <= {max_containment}",
-                f"StructuresThreated >= {structures_threatened}"
-            ]
-            
-            params = {
-                'where': ' AND '.join(where_conditions),
-                'outFields': '*',
-                'f': 'geojson',
-                'orderByFields': 'DailyAcres DESC'
-            }
+            params = self._build_high_priority_params(min_acres, max_containment, structures_threatened, state_code, top_k)
             
             logger.info("Fetching high-priority fires for ember analysis")
-            response = self.session.get(endpoint, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get_json(endpoint, params)
             logger.info(f"Retrieved {len(data.get('features', []))} high-priority fires")
             
             return data
@@ -207,6 +999,54 @@ class FirePerimeterService:
             logger.error(f"Error fetching high-priority fires: {str(e)}")
             raise
     
+    def get_statistics(self, 
+                       perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT,
+                       **filters) -> Dict:
+        """
+        Get summary statistics computed by the ArcGIS server
+        
+        Totals and per-state counts come from outStatistics queries and the
+        largest fire from a one-record query, so no perimeters are downloaded
+        
+        Args:
+            perimeter_type: Type of perimeter data to summarize
+            **filters: Query filters accepted by _build_query_params
+        
+        Returns:
+            Totals, averages, affected state count and the largest fire, in
+            the same shape as analysis.summarize_fires
+        """
+        try:
+            endpoint = self.endpoints[perimeter_type]
+            queries = self._build_statistics_params(**filters)
+            
+            logger.info(f"Fetching {perimeter_type.value} fire statistics")
+            with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+                results = dict(zip(queries, executor.map(
+                    lambda params: self._get_json(endpoint, params), queries.values()
+                )))
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching fire statistics: {str(e)}")
+            raise
+        
+        return self._compose_statistics(results)
+    
+    def _fetch_many(self, perimeter_types: List[FirePerimeterType]) -> Dict[FirePerimeterType, Dict]:
+        """
+        Fetch several perimeter types concurrently over the pooled client
+        
+        Args:
+            perimeter_types: Types of perimeter data to fetch
+        
+        Returns:
+            Dict mapping each perimeter type to its GeoJSON FeatureCollection
+        """
+        with ThreadPoolExecutor(max_workers=len(perimeter_types)) as executor:
+            results = executor.map(self.get_fire_perimeters, perimeter_types)
+            
+            return dict(zip(perimeter_types, results))
+    
     def get_fire_growth_analysis(self, days_back: int = 7) -> Dict:
         """
         Analyze fire growth over the past specified days
@@ -221,14 +1061,15 @@ class FirePerimeterService:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days_back)
             
-            # Get current fires
-            current_fires = self.get_fire_perimeters(FirePerimeterType.CURRENT)
-            
-            # Get historical data for comparison
-            historical_fires = self.get_fire_perimeters(FirePerimeterType.YEAR_TO_DATE)
+            # Get current fires and historical data for comparison concurrently
+            fires = self._fetch_many([FirePerimeterType.CURRENT, FirePerimeterType.YEAR_TO_DATE])
             
             # Analyze growth patterns
-            growth_analysis = self._analyze_fire_growth(current_fires, historical_fires, start_date)
+            growth_analysis = self._analyze_fire_growth(
+                fires[FirePerimeterType.CURRENT],
+                fires[FirePerimeterType.YEAR_TO_DATE],
+                start_date
+            )
             
             return growth_analysis
             
@@ -236,64 +1077,88 @@ class FirePerimeterService:
             logger.error(f"Error analyzing fire growth: {str(e)}")
             raise
     
-    def parse_fire_features(self, geojson_data: Dict) -> List[FirePerimeter]:
+    def parse_fire_features(self, geojson_data: Union[Dict, Iterable[Dict]]) -> List[FirePerimeter]:
         """
         Parse GeoJSON features into FirePerimeter objects
         
         Args:
-            geojson_data: GeoJSON FeatureCollection from API
+            geojson_data: GeoJSON FeatureCollection from API, or an iterable of
+                features such as iter_fire_perimeters()
         
         Returns:
             List of FirePerimeter objects
         """
-        fire_perimeters = []
+        features = geojson_data.get('features', []) if isinstance(geojson_data, dict) else geojson_data
         
-        for feature in geojson_data.get('features', []):
-            properties = feature.get('properties', {})
-            geometry = feature.get('geometry', {})
-            
-            try:
-                fire_perimeter = FirePerimeter(
-                    incident_id=properties.get('IRWINID', ''),
-                    incident_name=properties.get('IncidentName', ''),
-                    geometry=geometry,
-                    acres=float(properties.get('DailyAcres', 0)),
-                    containment_percent=int(properties.get('PercentContained', 0)),
-                    discovery_date=self._parse_date(properties.get('FireDiscoveryDateTime')),
-                    state=properties.get('POOState', ''),
-                    county=properties.get('POOCounty', ''),
-                    fire_cause=properties.get('FireCause', ''),
-                    fire_behavior=properties.get('FireBehaviorGeneral', ''),
-                    poi_latitude=float(properties.get('InitialLatitude', 0)),
-                    poi_longitude=float(properties.get('InitialLongitude', 0)),
-                    suppression_method=properties.get('SuppressionMethod', ''),
-                    initial_response_acres=float(properties.get('InitialResponseAcres', 0)),
-                    total_personnel=int(properties.get('TotalPersonnel', 0)),
-                    structures_threatened=int(properties.get('StructuresThreated', 0)),
-                    structures_destroyed=int(properties.get('StructuresDestroyed', 0)),
-                    fire_management_complexity=properties.get('FireMgmtComplexity', ''),
-                    estimated_cost=float(properties.get('EstimatedCostToDate', 0)),
-                    fire_origin=properties.get('FireOrigin', ''),
-                    weather_concerns=properties.get('WeatherConcerns', ''),
-                    fuel_model=properties.get('FuelModel', ''),
-                    fire_danger_rating=properties.get('FireDangerRating', '')
-                )
-                
-                fire_perimeters.append(fire_perimeter)
-                
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Error parsing fire feature: {str(e)}")
-                continue
+        return _parse_features(list(features))
+    
+    def iter_fire_features(self, geojson_data: Union[Dict, Iterable[Dict]]) -> Iterator[FirePerimeter]:
+        """
+        Parse GeoJSON features into FirePerimeter objects lazily
+        
+        Features are parsed in batches of PARSE_BATCH_SIZE, so every parsed
+        fire is never held at once
+        
+        Args:
+            geojson_data: GeoJSON FeatureCollection from API, or an iterable of
+                features such as iter_fire_perimeters()
+        
+        Yields:
+            FirePerimeter objects in feature order
+        """
+        features = iter(geojson_data.get('features', []) if isinstance(geojson_data, dict) else geojson_data)
         
-        return fire_perimeters
+        while batch := list(islice(features, self.PARSE_BATCH_SIZE)):
+            yield from _parse_features(batch)
     
-    def save_fire_data(self, fire_perimeters: List[FirePerimeter], filename: str = None) -> Path:
+    def iter_fires(self, 
+                   perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT,
+                   predicate: Optional[Callable[[Dict], bool]] = None,
+                   **kwargs) -> Iterator[FirePerimeter]:
+        """
+        Stream, filter and parse fire perimeters in a single pass
+        
+        Args:
+            perimeter_type: Type of perimeter data to fetch
+            predicate: Optional test on each feature's properties; features it
+                rejects are dropped before any parsing
+            **kwargs: Query filters accepted by iter_fire_perimeters
+        
+        Yields:
+            FirePerimeter objects as the response streams in
+        """
+        features = self.iter_fire_perimeters(perimeter_type, **kwargs)
+        
+        if predicate is not None:
+            features = (feature for feature in features if predicate(feature.get('properties') or {}))
+        
+        return self.iter_fire_features(features)
+    
+    def build_index(self, geojson_data: Union[Dict, List[Dict]]) -> FireSpatialIndex:
+        """
+        Build an STRtree index for repeated point-in-fire and bbox queries
+        
+        Args:
+            geojson_data: GeoJSON FeatureCollection from API, or a list of features
+        
+        Returns:
+            FireSpatialIndex over the fire perimeters; reuse it for as long as
+            the underlying data is current
+        """
+        features = geojson_data.get('features', []) if isinstance(geojson_data, dict) else geojson_data
+        
+        return FireSpatialIndex(features)
+    
+    def save_fire_data(self, fire_perimeters: List[FirePerimeter], filename: str = None,
+                       compress: bool = False) -> Path:
         """
         Save fire perimeter data to JSON file
         
         Args:
             fire_perimeters: List of FirePerimeter objects
             filename: Optional filename, auto-generated if not provided
+            compress: Write zstd-compressed JSON; the file then ends in
+                '.json.zst' (e.g. fire_perimeters_<timestamp>.json.zst)
         
         Returns:
             Path to saved file
@@ -306,113 +1171,312 @@ class FirePerimeterService:
         filepath.parent.mkdir(exist_ok=True)
         
         data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "count": len(fire_perimeters),
             "fires": [fire.to_dict() for fire in fire_perimeters]
         }
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        # orjson writes bytes directly and serializes datetimes natively
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        
+        if compress:
+            # Polygon coordinates are repetitive and compress 5-10x
+            filepath = filepath.with_suffix('.json.zst')
+            with open(filepath, 'wb') as f, zstandard.ZstdCompressor(level=6).stream_writer(f) as writer:
+                writer.write(payload)
+        else:
+            filepath.write_bytes(payload)
         
         logger.info(f"Saved {len(fire_perimeters)} fire perimeters to {filepath}")
         return filepath
     
-    def _build_query_params(self, 
-                          bbox: Optional[str] = None,
-                          state_code: Optional[str] = None,
-                          min_acres: Optional[int] = None,
-                          max_age_days: Optional[int] = None) -> Dict:
-        """Build query parameters for API request"""
-        params = {
-            'where': '1=1',
-            'outFields': '*',
-            'f': 'geojson'
-        }
+    def _parse_date(self, date_str: Union[str, int, float, None]) -> Optional[datetime]:
+        """Parse date string from API response"""
+        if not date_str:
+            return None
         
-        where_conditions = []
+        return _parse_date_cached(date_str)
+
+
+class AsyncFirePerimeterService(_BaseFirePerimeterService):
+    """Async version of FirePerimeterService for concurrent requests
+    
+    A single httpx client is shared by every request so that concurrent
+    queries are multiplexed over pooled HTTP/2 connections. Use the service
+    as an async context manager, or call close() when finished.
+    """
+    
+    # Radius covered by one tile in coordinate searches, and the tile grid cap
+    TILE_RADIUS_MILES = 250
+    MAX_TILES_PER_SIDE = 4
+    
+    # Features per page (below the layers' usual 2000 maxRecordCount) and the page cap
+    DEFAULT_PAGE_SIZE = 1000
+    DEFAULT_MAX_PAGES = 20
+    
+    # The archive layers hold decades of full-geometry perimeters; an unfiltered
+    # query stops after this many pages instead of pulling ~20k polygons
+    ARCHIVE_LAYERS = frozenset({FirePerimeterType.HISTORICAL, FirePerimeterType.CERTIFIED})
+    ARCHIVE_MAX_PAGES = 2
+    
+    # Pool sizes of the shared client; paged queries from many concurrent
+    # API requests all draw on the same pool
+    MAX_CONNECTIONS = 50
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    
+    def __init__(self):
+        super().__init__()
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def __aenter__(self) -> "AsyncFirePerimeterService":
+        await self.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            # Pooled keep-alive connections amortize TCP/TLS setup across queries
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS,
+                    max_connections=self.MAX_CONNECTIONS,
+                    keepalive_expiry=60
+                ),
+                headers={'User-Agent': 'EmberAI-FirePerimeter-Service/1.0', 'Accept-Encoding': 'gzip'},
+                timeout=30.0
+            )
+        return self._client
+    
+    async def open(self) -> None:
+        """Create the shared client (must be called from a running event loop)"""
+        self._get_client()
+    
+    async def close(self) -> None:
+        """Close the shared client"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    async def _fetch_json(self, endpoint: str, params: Dict) -> Dict:
+        """Issue a query against an endpoint using the shared client"""
+        response = await self._get_client().get(self._query_url(endpoint, params))
+        response.raise_for_status()
+        data = orjson.loads(response.content)
         
-        if state_code:
-            where_conditions.append(f"POOState='{state_code.upper()}'")
+        self._mark_upstream_ok()
+        return data
+    
+    async def _fetch_features(self, endpoint: str, params: Dict,
+                              page_size: Optional[int], max_pages: int) -> Dict:
+        """
+        Fetch every matching feature, paging through Esri JSON results
         
-        if min_acres:
-            where_conditions.append(f"DailyAcres >= {min_acres}")
+        f=geojson responses stop silently at the layer's maxRecordCount. Paged
+        f=json queries are complete and smaller; the record count is fetched
+        alongside the first page, the remaining pages are fetched concurrently,
+        and features are converted to GeoJSON client-side
         
-        if max_age_days:
-            cutoff_date = datetime.now() - timedelta(days=max_age_days)
-            date_str = cutoff_date.strftime("%Y-%m-%d")
-            where_conditions.append(f"FireDiscoveryDateTime >= '{date_str}'")
+        Args:
+            endpoint: Layer query endpoint
+            params: Query parameters from _build_query_params
+            page_size: Features per page, or None for a single f=geojson query
+            max_pages: Maximum number of pages to fetch
         
-        if where_conditions:
-            params['where'] = ' AND '.join(where_conditions)
+        Returns:
+            GeoJSON FeatureCollection
+        """
+        if page_size is None:
+            return await self._fetch_json(endpoint, params)
         
-        if bbox:
-            params['geometry'] = bbox
-            params['geometryType'] = 'esriGeometryEnvelope'
-            params['spatialRel'] = 'esriSpatialRelIntersects'
+        page_params = {**params, 'f': 'json', 'outSR': '4326', 'returnExceededLimitFeatures': 'true'}
+        # Stable order across pages: OBJECTID breaks ties in any caller-supplied
+        # ordering so that no record is duplicated or skipped between offsets
+        order = params.get('orderByFields')
+        if not order:
+            page_params['orderByFields'] = 'OBJECTID ASC'
+        elif 'OBJECTID' not in order.upper():
+            page_params['orderByFields'] = f"{order}, OBJECTID ASC"
+        count_params = {key: value for key, value in params.items() if key != 'orderByFields'}
+        count_params.update({'f': 'json', 'returnCountOnly': 'true'})
         
-        return params
-    
-    def _parse_date(self, date_str: str) -> Optional[datetime]:
-        """Parse date string from API response"""
-        if not date_str:
-            return None
+        def fetch_page(offset: int, record_count: int):
+            return self._fetch_json(endpoint, {**page_params, 'resultOffset': offset, 'resultRecordCount': record_count})
         
-        try:
-            # Handle various date formats from the API
-            if date_str.isdigit():
-                # Unix timestamp in milliseconds
-                return datetime.fromtimestamp(int(date_str) / 1000)
-            else:
-                # ISO format
-                return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        except (ValueError, TypeError):
-            logger.warning(f"Could not parse date: {date_str}")
-            return None
-    
-    def _analyze_fire_growth(self, current_fires: Dict, historical_fires: Dict, start_date: datetime) -> Dict:
-        """Analyze fire growth patterns"""
-        # This is a placeholder for more sophisticated growth analysis
-        # In a real implementation, you would compare fire sizes over time
+        count, first_page = await asyncio.gather(
+            self._fetch_json(endpoint, count_params),
+            fetch_page(0, page_size)
+        )
         
-        current_count = len(current_fires.get('features', []))
-        historical_count = len(historical_fires.get('features', []))
+        # A server maxRecordCount below page_size caps every page; page by what it returned
+        first_features = first_page.get('features', [])
+        if first_page.get('exceededTransferLimit') and 0 < len(first_features) < page_size:
+            page_size = len(first_features)
+        
+        total = int(count.get('count', 0))
+        page_count = min(math.ceil(total / page_size), max_pages)
+        if total > page_count * page_size:
+            logger.warning(f"Stopped after {max_pages} pages; {total - page_count * page_size} fires not fetched")
+        
+        pages = [first_page]
+        if page_count > 1:
+            pages += await asyncio.gather(*(
+                fetch_page(page * page_size, page_size) for page in range(1, page_count)
+            ))
         
         return {
-            "analysis_date": datetime.now().isoformat(),
-            "current_active_fires": current_count,
-            "total_ytd_fires": historical_count,
-            "growth_rate": "Analysis placeholder - implement detailed growth tracking",
-            "high_growth_fires": [],
-            "ember_risk_fires": []
-        }
-
-
-class AsyncFirePerimeterService:
-    """Async version of FirePerimeterService for concurrent requests"""
-    
-    def __init__(self):
-        self.base_url = "https://services3.arcgis.com/T4QMspbfLg3qTGWY/ArcGIS/rest/services"
-        self.endpoints = {
-            FirePerimeterType.CURRENT: f"{self.base_url}/WFIGS_Interagency_Perimeters_Current/FeatureServer/0/query",
-            FirePerimeterType.YEAR_TO_DATE: f"{self.base_url}/WFIGS_Interagency_Perimeters_YearToDate/FeatureServer/0/query",
-            FirePerimeterType.CERTIFIED: f"{self.base_url}/WFIGS_Interagency_Perimeters_Certified/FeatureServer/0/query"
+            "type": "FeatureCollection",
+            "features": [esri_to_geojson_feature(feature) for page in pages for feature in page.get('features', [])]
         }
     
     async def get_fire_perimeters_async(self, 
                                       perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT,
+                                      page_size: Optional[int] = DEFAULT_PAGE_SIZE,
+                                      max_pages: Optional[int] = None,
                                       **kwargs) -> Dict:
-        """Async version of get_fire_perimeters"""
+        """Async version of get_fire_perimeters
         
-        async with aiohttp.ClientSession() as session:
-            endpoint = self.endpoints[perimeter_type]
-            params = self._build_query_params(**kwargs)
+        Results are paged with f=json (see _fetch_features); pass
+        page_size=None for a single f=geojson query. max_pages defaults to
+        ARCHIVE_MAX_PAGES for the archive layers and DEFAULT_MAX_PAGES otherwise
+        """
+        if max_pages is None:
+            max_pages = self.ARCHIVE_MAX_PAGES if perimeter_type in self.ARCHIVE_LAYERS else self.DEFAULT_MAX_PAGES
+        
+        endpoint = self.endpoints[perimeter_type]
+        params = self._build_query_params(**kwargs, perimeter_type=perimeter_type)
+        
+        data = await self._fetch_features(endpoint, params, page_size, max_pages)
+        
+        logger.info(f"Retrieved {len(data.get('features', []))} fire perimeters (async)")
+        return data
+    
+    async def iter_fire_perimeters_async(self, 
+                                         perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT,
+                                         **kwargs) -> AsyncIterator[Dict]:
+        """
+        Async version of iter_fire_perimeters, yielding features as the response streams in
+        
+        Args:
+            perimeter_type: Type of perimeter data to fetch
+            **kwargs: Query filters accepted by _build_query_params
+        
+        Yields:
+            GeoJSON features of the FeatureCollection
+        """
+        endpoint = self.endpoints[perimeter_type]
+        params = self._build_query_params(**kwargs, perimeter_type=perimeter_type)
+        
+        async with self._get_client().stream('GET', self._query_url(endpoint, params)) as response:
+            response.raise_for_status()
             
-            async with session.get(endpoint, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
-                
-                logger.info(f"Retrieved {len(data.get('features', []))} fire perimeters (async)")
-                return data
+            count = 0
+            features = ijson.sendable_list()
+            parser = ijson.items_coro(features, 'features.item', use_float=True)
+            async for chunk in response.aiter_bytes():
+                parser.send(chunk)
+                count += len(features)
+                for feature in features:
+                    yield feature
+                del features[:]
+            
+            parser.close()
+            count += len(features)
+            for feature in features:
+                yield feature
+        
+        self._mark_upstream_ok()
+        logger.info(f"Streamed {count} fire perimeters (async)")
+    
+    async def get_fire_count_async(self, 
+                                 perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT,
+                                 **kwargs) -> int:
+        """Count matching fires without downloading any features"""
+        endpoint = self.endpoints[perimeter_type]
+        params = self._build_query_params(**kwargs, perimeter_type=perimeter_type)
+        params['f'] = 'json'
+        params['returnCountOnly'] = 'true'
+        
+        data = await self._fetch_json(endpoint, params)
+        
+        return int(data.get('count', 0))
+    
+    async def get_fires_by_coordinates_async(self, 
+                                           latitude: float, 
+                                           longitude: float, 
+                                           radius_miles: float = 50,
+                                           perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT) -> Dict:
+        """Async version of get_fires_by_coordinates
+        
+        Searches wider than TILE_RADIUS_MILES are split into a grid of tiles
+        fetched concurrently, which parallelizes the download and keeps each
+        query under the layer's maxRecordCount; fires returned by more than
+        one tile are merged on IRWINID, falling back to OBJECTID and then to
+        a hash of the geometry for records without an incident ID
+        """
+        tiles_per_side = min(math.ceil(radius_miles / self.TILE_RADIUS_MILES), self.MAX_TILES_PER_SIDE)
+        
+        if tiles_per_side <= 1:
+            bbox = self._bbox_around(latitude, longitude, radius_miles)
+            data = await self.get_fire_perimeters_async(perimeter_type, bbox=bbox)
+            return {**data, 'features': filter_within_radius(data.get('features', []), latitude, longitude, radius_miles)}
+        
+        tiles = split_bbox(*bbox_around(latitude, longitude, radius_miles), tiles_per_side)
+        results = await asyncio.gather(*(
+            self.get_fire_perimeters_async(perimeter_type, bbox=','.join(str(value) for value in tile))
+            for tile in tiles
+        ))
+        
+        features = []
+        seen = set()
+        for result in results:
+            for feature in result.get('features', []):
+                properties = feature.get('properties') or {}
+                key = properties.get('IRWINID') or feature.get('id') or properties.get('OBJECTID')
+                if key is None and feature.get('geometry') is not None:
+                    key = hashlib.blake2b(orjson.dumps(feature['geometry']), digest_size=16).digest()
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                features.append(feature)
+        
+        return {**results[0], 'features': filter_within_radius(features, latitude, longitude, radius_miles)}
+    
+    async def get_high_priority_fires_async(self, 
+                                          min_acres: int = 1000,
+                                          max_containment: int = 50,
+                                          structures_threatened: int = 1,
+                                          state_code: Optional[str] = None,
+                                          top_k: Optional[int] = None,
+                                          page_size: Optional[int] = DEFAULT_PAGE_SIZE,
+                                          max_pages: int = DEFAULT_MAX_PAGES) -> Dict:
+        """Async version of get_high_priority_fires, paged like get_fire_perimeters_async"""
+        endpoint = self.endpoints[FirePerimeterType.CURRENT]
+        params = self._build_high_priority_params(min_acres, max_containment, structures_threatened, state_code, top_k)
+        
+        if top_k is not None:
+            # The top K arrive in a single response, so skip paging
+            page_size = None
+        
+        data = await self._fetch_features(endpoint, params, page_size, max_pages)
+        
+        logger.info(f"Retrieved {len(data.get('features', []))} high-priority fires (async)")
+        return data
+    
+    async def get_statistics_async(self, 
+                                   perimeter_type: FirePerimeterType = FirePerimeterType.CURRENT,
+                                   **filters) -> Dict:
+        """Async version of get_statistics, running the statistics queries concurrently"""
+        endpoint = self.endpoints[perimeter_type]
+        queries = self._build_statistics_params(**filters)
+        
+        responses = await asyncio.gather(*(self._fetch_json(endpoint, params) for params in queries.values()))
+        
+        return self._compose_statistics(dict(zip(queries, responses)))
     
     async def get_multiple_fire_types_async(self, 
                                           perimeter_types: List[FirePerimeterType],
@@ -428,18 +1492,17 @@ class AsyncFirePerimeterService:
         
         return dict(zip(perimeter_types, results))
     
-    def _build_query_params(self, **kwargs) -> Dict:
-        """Build query parameters (same as sync version)"""
-        params = {
-            'where': '1=1',
-            'outFields': '*',
-            'f': 'geojson'
-        }
+    async def get_fire_growth_analysis_async(self, days_back: int = 7) -> Dict:
+        """Async version of get_fire_growth_analysis"""
+        start_date = datetime.now() - timedelta(days=days_back)
         
-        # Add filtering logic similar to sync version
-        # ... (implementation details)
+        fires = await self.get_multiple_fire_types_async([FirePerimeterType.CURRENT, FirePerimeterType.YEAR_TO_DATE])
         
-        return params
+        return self._analyze_fire_growth(
+            fires[FirePerimeterType.CURRENT],
+            fires[FirePerimeterType.YEAR_TO_DATE],
+            start_date
+        )
 
 
 # Example usage and testing
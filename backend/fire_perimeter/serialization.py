@@ -0,0 +1,171 @@
+"""
+Serialization helpers for EmberAI fire perimeter data
+Encodes GeoJSON with orjson for HTTP responses and converts Esri JSON
+query results to GeoJSON
+"""
+
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import orjson
+from starlette.responses import JSONResponse
+
+# RFC 8142 GeoJSON text sequences prefix each record with an ASCII record separator
+RECORD_SEPARATOR = b'\x1e'
+GEOJSON_SEQ_MEDIA_TYPE = "application/geo+json-seq"
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode content with orjson, accepting NumPy arrays and non-string keys"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, which also accepts NumPy arrays"""
+    
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+
+def iter_geojson_seq(features: Iterable[Dict]) -> Iterator[bytes]:
+    """
+    Encode features as an RFC 8142 GeoJSON text sequence
+    
+    Args:
+        features: Iterable of GeoJSON feature dicts
+    
+    Yields:
+        One encoded record per feature, so consumers can parse incrementally
+    """
+    for feature in features:
+        yield RECORD_SEPARATOR + orjson.dumps(feature) + b'\n'
+
+
+def iter_feature_collection(collection: Dict, batch_size: int = 100) -> Iterator[bytes]:
+    """
+    Encode a FeatureCollection incrementally
+    
+    The response body is never built as one buffer, and the first bytes go
+    out as soon as the first batch of features is encoded
+    
+    Args:
+        collection: GeoJSON FeatureCollection
+        batch_size: Features encoded per yielded chunk, which keeps the number
+            of ASGI sends low
+    
+    Yields:
+        Chunks that concatenate to the JSON encoding of the collection
+    """
+    members = orjson.dumps({key: value for key, value in collection.items() if key != 'features'})
+    yield members[:-1] + (b',"features":[' if len(members) > 2 else b'"features":[')
+    
+    features = collection.get('features') or []
+    for start in range(0, len(features), batch_size):
+        chunk = b','.join(orjson.dumps(feature) for feature in features[start:start + batch_size])
+        yield chunk if start == 0 else b',' + chunk
+    
+    yield b']}'
+
+
+def _round_coordinates(coordinates: List, precision: int) -> List:
+    """Round a GeoJSON coordinate array of any nesting depth, one NumPy call per ring"""
+    if not coordinates:
+        return coordinates
+    
+    # A single position or a ring/line of positions rounds as one array
+    if not isinstance(coordinates[0], list) or not isinstance(coordinates[0][0], list):
+        return np.round(np.asarray(coordinates, dtype=np.float64), precision).tolist()
+    
+    return [_round_coordinates(part, precision) for part in coordinates]
+
+
+def compact_feature(feature: Dict, properties: Optional[Collection[str]] = None,
+                    precision: Optional[int] = None) -> Dict:
+    """
+    Copy a feature with fewer properties and shorter coordinates
+    
+    Args:
+        feature: GeoJSON feature, left unmodified
+        properties: Property names to keep, or None to keep them all
+        precision: Decimal places to round coordinates to (5 is about 1 m),
+            or None to keep full precision
+    
+    Returns:
+        The compacted feature
+    """
+    compact = dict(feature)
+    
+    if properties is not None:
+        compact['properties'] = {
+            name: value for name, value in (feature.get('properties') or {}).items() if name in properties
+        }
+    
+    geometry = feature.get('geometry')
+    if precision is not None and geometry and geometry.get('coordinates'):
+        compact['geometry'] = {**geometry, 'coordinates': _round_coordinates(geometry['coordinates'], precision)}
+    
+    return compact
+
+
+def compact_feature_collection(collection: Dict, properties: Optional[Collection[str]] = None,
+                               precision: Optional[int] = None) -> Dict:
+    """Apply compact_feature to every feature of a FeatureCollection, returning a new collection"""
+    return {
+        **collection,
+        'features': [compact_feature(feature, properties, precision) for feature in collection.get('features') or []]
+    }
+
+
+def _ring_is_clockwise(ring: List) -> bool:
+    """Esri outer rings run clockwise (negative shoelace area); holes run counter-clockwise"""
+    xy = np.asarray(ring, dtype=np.float64)[:, :2]
+    if len(xy) < 3:
+        return True
+    x, y = xy[:, 0], xy[:, 1]
+    return float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) < 0
+
+
+def _esri_to_geojson_geometry(geometry: Optional[Dict]) -> Optional[Dict]:
+    """Convert an Esri JSON polygon or point geometry to GeoJSON"""
+    if not geometry:
+        return None
+    
+    if 'rings' in geometry:
+        # Each clockwise ring starts a polygon; the counter-clockwise rings after it are its holes
+        polygons = []
+        for ring in geometry['rings']:
+            if _ring_is_clockwise(ring) or not polygons:
+                polygons.append([ring])
+            else:
+                polygons[-1].append(ring)
+        
+        if len(polygons) == 1:
+            return {'type': 'Polygon', 'coordinates': polygons[0]}
+        return {'type': 'MultiPolygon', 'coordinates': polygons}
+    
+    if 'x' in geometry and 'y' in geometry:
+        return {'type': 'Point', 'coordinates': [geometry['x'], geometry['y']]}
+    
+    return None
+
+
+def esri_to_geojson_feature(feature: Dict) -> Dict:
+    """
+    Convert an Esri JSON feature (f=json query result) to a GeoJSON feature
+    
+    Args:
+        feature: Esri JSON feature with attributes and geometry
+    
+    Returns:
+        GeoJSON feature with the attributes as properties and OBJECTID as id
+    """
+    attributes = feature.get('attributes') or {}
+    geojson = {'type': 'Feature'}
+    
+    if 'OBJECTID' in attributes:
+        geojson['id'] = attributes['OBJECTID']
+    
+    geojson['geometry'] = _esri_to_geojson_geometry(feature.get('geometry'))
+    geojson['properties'] = attributes
+    
+    return geojson
@@ -0,0 +1,371 @@
+"""
+Spatial indexing for EmberAI fire perimeter data
+Answers bounding-box and radius queries locally from an STRtree built once
+per upstream refresh, instead of scanning every feature
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+from numba import njit
+from shapely.geometry import box, shape
+
+# Approximate miles per degree of latitude
+MILES_PER_DEGREE = 69.0
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_MILES = 3958.8
+
+# Latitude limit of the Web Mercator slippy-map tile grid
+MAX_TILE_LATITUDE = 85.0511287798
+
+
+def bbox_around(latitude: float, longitude: float, radius_miles: float) -> Tuple[float, float, float, float]:
+    """
+    Build an approximate bounding box around coordinates
+    
+    Args:
+        latitude: Latitude in decimal degrees
+        longitude: Longitude in decimal degrees
+        radius_miles: Search radius in miles
+    
+    Returns:
+        Tuple of (xmin, ymin, xmax, ymax) in WGS84 degrees
+    """
+    degree_radius = radius_miles / MILES_PER_DEGREE
+    
+    # Degrees of longitude shrink with cos(latitude); widen the box to match
+    lon_radius = min(degree_radius / max(math.cos(math.radians(latitude)), 1e-6), 180.0)
+    
+    return (longitude - lon_radius, latitude - degree_radius,
+            longitude + lon_radius, latitude + degree_radius)
+
+
+def snap_bbox(xmin: float, ymin: float, xmax: float, ymax: float,
+              grid_degrees: float = 0.1) -> Tuple[float, float, float, float]:
+    """
+    Expand a bounding box outward to a fixed grid
+    
+    Nearby searches for almost identical coordinates then produce the same
+    bounding box, and therefore the same cache key
+    
+    Args:
+        xmin, ymin, xmax, ymax: Bounding box in WGS84 degrees
+        grid_degrees: Grid cell size in degrees
+    
+    Returns:
+        Tuple of (xmin, ymin, xmax, ymax) covering the input box
+    """
+    return (round(math.floor(xmin / grid_degrees) * grid_degrees, 6),
+            round(math.floor(ymin / grid_degrees) * grid_degrees, 6),
+            round(math.ceil(xmax / grid_degrees) * grid_degrees, 6),
+            round(math.ceil(ymax / grid_degrees) * grid_degrees, 6))
+
+
+def split_bbox(xmin: float, ymin: float, xmax: float, ymax: float,
+               tiles_per_side: int) -> List[Tuple[float, float, float, float]]:
+    """
+    Partition a bounding box into an evenly sized grid of tiles
+    
+    Args:
+        xmin, ymin, xmax, ymax: Bounding box in WGS84 degrees
+        tiles_per_side: Number of tiles along each axis
+    
+    Returns:
+        tiles_per_side ** 2 tiles as (xmin, ymin, xmax, ymax) tuples
+    """
+    xs = np.linspace(xmin, xmax, tiles_per_side + 1).tolist()
+    ys = np.linspace(ymin, ymax, tiles_per_side + 1).tolist()
+    
+    return [(xs[i], ys[j], xs[i + 1], ys[j + 1])
+            for j in range(tiles_per_side) for i in range(tiles_per_side)]
+
+
+def bbox_to_tiles(xmin: float, ymin: float, xmax: float, ymax: float,
+                  zoom: int = 8) -> Tuple[int, int, int, int]:
+    """
+    Get the range of slippy-map tiles covering a bounding box
+    
+    Args:
+        xmin, ymin, xmax, ymax: Bounding box in WGS84 degrees
+        zoom: Tile zoom level; zoom 8 tiles are about 1.4 degrees wide
+    
+    Returns:
+        Tuple of (min x, min y, max x, max y) tile indices; tile y grows southward
+    """
+    n = 2 ** zoom
+    
+    def tile_x(lon: float) -> int:
+        return min(max(int((lon + 180.0) / 360.0 * n), 0), n - 1)
+    
+    def tile_y(lat: float) -> int:
+        lat = math.radians(min(max(lat, -MAX_TILE_LATITUDE), MAX_TILE_LATITUDE))
+        return min(max(int((1.0 - math.asinh(math.tan(lat)) / math.pi) / 2.0 * n), 0), n - 1)
+    
+    return tile_x(xmin), tile_y(ymax), tile_x(xmax), tile_y(ymin)
+
+
+def tiles_to_bbox(x0: int, y0: int, x1: int, y1: int, zoom: int = 8) -> Tuple[float, float, float, float]:
+    """
+    Get the bounding box of a range of slippy-map tiles
+    
+    Args:
+        x0, y0, x1, y1: Tile index range from bbox_to_tiles
+        zoom: Tile zoom level
+    
+    Returns:
+        Tuple of (xmin, ymin, xmax, ymax) in WGS84 degrees
+    """
+    n = 2 ** zoom
+    
+    def lon(x: int) -> float:
+        return round(x / n * 360.0 - 180.0, 6)
+    
+    def lat(y: int) -> float:
+        return round(math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n)))), 6)
+    
+    return lon(x0), lat(y1 + 1), lon(x1 + 1), lat(y0)
+
+
+def snap_bbox_to_tiles(xmin: float, ymin: float, xmax: float, ymax: float,
+                       zoom: int = 8) -> Tuple[float, float, float, float]:
+    """
+    Expand a bounding box outward to slippy-map tile edges
+    
+    Map viewports that differ by a small pan or zoom then cover the same
+    tiles, and therefore produce the same cache key
+    
+    Args:
+        xmin, ymin, xmax, ymax: Bounding box in WGS84 degrees
+        zoom: Tile zoom level
+    
+    Returns:
+        Tuple of (xmin, ymin, xmax, ymax) covering the input box
+    """
+    return tiles_to_bbox(*bbox_to_tiles(xmin, ymin, xmax, ymax, zoom), zoom)
+
+
+def flatten_rings(geometry: Dict, dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Flatten Polygon/MultiPolygon rings into one coordinate buffer
+    
+    Args:
+        geometry: GeoJSON geometry dict
+        dtype: Coordinate dtype
+    
+    Returns:
+        Tuple of (coords_xy, ring_offsets) where coords_xy is an (N, 2) array
+        of lon/lat pairs and ring i spans coords_xy[ring_offsets[i]:ring_offsets[i + 1]]
+    """
+    geometry_type = (geometry or {}).get('type')
+    coordinates = geometry.get('coordinates') if geometry_type else None
+    
+    if geometry_type == 'Polygon':
+        rings = coordinates or []
+    elif geometry_type == 'MultiPolygon':
+        rings = [ring for polygon in coordinates or [] for ring in polygon]
+    else:
+        rings = []
+    
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.int32)
+    np.cumsum([len(ring) for ring in rings], out=ring_offsets[1:])
+    
+    if not ring_offsets[-1]:
+        return np.empty((0, 2), dtype=dtype), ring_offsets
+    
+    coords_xy = np.asarray(
+        [point[:2] for ring in rings for point in ring], dtype=dtype
+    ).reshape(-1, 2)
+    
+    return coords_xy, ring_offsets
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class RaggedGeometry:
+    """
+    Polygon or MultiPolygon held as flat NumPy buffers instead of nested lists
+    
+    A float32 vertex costs 8 bytes against roughly 80 for a [lon, lat] list of
+    Python floats; the layout matches shapely.from_ragged_array
+    """
+    geometry_type: str
+    vertices: np.ndarray
+    ring_offsets: np.ndarray
+    polygon_offsets: np.ndarray
+    
+    # Decimal places written back to GeoJSON, about the precision float32 holds
+    PRECISION = 6
+    
+    @classmethod
+    def from_geojson(cls, geometry: Optional[Dict]) -> Optional["RaggedGeometry"]:
+        """
+        Flatten a GeoJSON geometry
+        
+        Args:
+            geometry: GeoJSON geometry dict
+        
+        Returns:
+            RaggedGeometry, or None when the geometry is missing or not a polygon
+        """
+        geometry_type = (geometry or {}).get('type')
+        if geometry_type not in ('Polygon', 'MultiPolygon'):
+            return None
+        
+        vertices, ring_offsets = flatten_rings(geometry, dtype=np.float32)
+        
+        # Polygon i owns rings polygon_offsets[i]:polygon_offsets[i + 1]
+        polygons = [geometry['coordinates'] or []] if geometry_type == 'Polygon' else geometry['coordinates'] or []
+        polygon_offsets = np.zeros(len(polygons) + 1, dtype=np.int32)
+        np.cumsum([len(polygon) for polygon in polygons], out=polygon_offsets[1:])
+        
+        return cls(geometry_type, vertices, ring_offsets, polygon_offsets)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RaggedGeometry):
+            return NotImplemented
+        return (self.geometry_type == other.geometry_type
+                and np.array_equal(self.vertices, other.vertices)
+                and np.array_equal(self.ring_offsets, other.ring_offsets)
+                and np.array_equal(self.polygon_offsets, other.polygon_offsets))
+    
+    @property
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """Bounding box as (xmin, ymin, xmax, ymax), or None without vertices"""
+        if not len(self.vertices):
+            return None
+        xmin, ymin = self.vertices.min(axis=0).tolist()
+        xmax, ymax = self.vertices.max(axis=0).tolist()
+        return tuple(round(value, self.PRECISION) for value in (xmin, ymin, xmax, ymax))
+    
+    def to_geojson(self) -> Dict:
+        """Rebuild the GeoJSON geometry dict"""
+        coords = np.round(self.vertices.astype(np.float64), self.PRECISION).tolist()
+        rings = [coords[start:end] for start, end in zip(self.ring_offsets[:-1].tolist(), self.ring_offsets[1:].tolist())]
+        polygons = [rings[start:end] for start, end in zip(self.polygon_offsets[:-1].tolist(), self.polygon_offsets[1:].tolist())]
+        
+        if self.geometry_type == 'Polygon':
+            return {'type': 'Polygon', 'coordinates': polygons[0] if polygons else []}
+        return {'type': 'MultiPolygon', 'coordinates': polygons}
+    
+    def to_shapely(self) -> shapely.Geometry:
+        """Build the shapely geometry straight from the buffers"""
+        geometry_type = shapely.GeometryType.POLYGON if self.geometry_type == 'Polygon' else shapely.GeometryType.MULTIPOLYGON
+        offsets = (self.ring_offsets, self.polygon_offsets)
+        if geometry_type == shapely.GeometryType.MULTIPOLYGON:
+            offsets += (np.array([0, len(self.polygon_offsets) - 1], dtype=np.int32),)
+        
+        return shapely.from_ragged_array(geometry_type, self.vertices.astype(np.float64), offsets)[0]
+
+
+@njit(fastmath=True, cache=True)
+def _haversine_mask(lats: np.ndarray, lons: np.ndarray, lat0: float, lon0: float, r_miles: float) -> np.ndarray:
+    """Flag the points within r_miles great-circle distance of (lat0, lon0)"""
+    n = lats.size
+    mask = np.empty(n, np.bool_)
+    phi0 = math.radians(lat0)
+    cos_phi0 = math.cos(phi0)
+    # Compare haversine terms rather than distances to skip the asin and sqrt per point
+    limit = math.sin(min(r_miles / EARTH_RADIUS_MILES, math.pi) / 2) ** 2
+    
+    for i in range(n):
+        phi = math.radians(np.float64(lats[i]))
+        dphi = phi - phi0
+        dlam = math.radians(np.float64(lons[i]) - lon0)
+        h = math.sin(dphi / 2) ** 2 + cos_phi0 * math.cos(phi) * math.sin(dlam / 2) ** 2
+        mask[i] = h <= limit
+    
+    return mask
+
+
+def filter_within_radius(features: List[Dict], latitude: float, longitude: float,
+                         radius_miles: float) -> List[Dict]:
+    """
+    Keep the fires whose point of origin lies within a true great-circle radius
+    
+    Bounding box queries return everything in the square around the search
+    point; this trims the corners, which are also badly sized at high latitudes
+    
+    Args:
+        features: GeoJSON features with InitialLatitude/InitialLongitude properties
+        latitude: Latitude in decimal degrees
+        longitude: Longitude in decimal degrees
+        radius_miles: Search radius in miles
+    
+    Returns:
+        Matching features in their original order; features without a point
+        of origin are kept, since their perimeter already matched the bbox
+    """
+    if not features:
+        return features
+    
+    properties = [feature.get('properties') or {} for feature in features]
+    lats = np.fromiter((props.get('InitialLatitude') if props.get('InitialLatitude') is not None else np.nan
+                        for props in properties), dtype=np.float32, count=len(features))
+    lons = np.fromiter((props.get('InitialLongitude') if props.get('InitialLongitude') is not None else np.nan
+                        for props in properties), dtype=np.float32, count=len(features))
+    
+    # fastmath assumes finite inputs, so missing coordinates are resolved outside the kernel
+    mask = _haversine_mask(lats, lons, float(latitude), float(longitude), float(radius_miles))
+    mask |= np.isnan(lats) | np.isnan(lons)
+    
+    return [features[i] for i in np.flatnonzero(mask).tolist()]
+
+
+class FireSpatialIndex:
+    """STRtree over fire perimeter geometries for local spatial queries"""
+    
+    def __init__(self, features: List[Dict]):
+        self.features = features
+        geometries = [
+            shape(feature['geometry']) if feature.get('geometry') else None
+            for feature in features
+        ]
+        self._tree = shapely.STRtree(geometries)
+    
+    def query_bbox(self, xmin: float, ymin: float, xmax: float, ymax: float) -> List[Dict]:
+        """
+        Get features whose perimeter intersects a bounding box
+        
+        Args:
+            xmin, ymin, xmax, ymax: Bounding box in WGS84 degrees
+        
+        Returns:
+            Matching features in their original order
+        """
+        hits = self._tree.query(box(xmin, ymin, xmax, ymax), predicate='intersects')
+        
+        return [self.features[i] for i in np.sort(hits)]
+    
+    def query_radius(self, latitude: float, longitude: float, radius_miles: float) -> List[Dict]:
+        """
+        Get features near coordinates, matching FirePerimeterService.get_fires_by_coordinates
+        
+        Args:
+            latitude: Latitude in decimal degrees
+            longitude: Longitude in decimal degrees
+            radius_miles: Search radius in miles
+        
+        Returns:
+            Matching features in their original order
+        """
+        candidates = self.query_bbox(*bbox_around(latitude, longitude, radius_miles))
+        
+        return filter_within_radius(candidates, latitude, longitude, radius_miles)
+    
+    def query_point(self, latitude: float, longitude: float) -> List[Dict]:
+        """
+        Get the fires whose perimeter contains a point
+        
+        Args:
+            latitude: Latitude in decimal degrees
+            longitude: Longitude in decimal degrees
+        
+        Returns:
+            Matching features in their original order
+        """
+        hits = self._tree.query(shapely.Point(longitude, latitude), predicate='intersects')
+        
+        return [self.features[i] for i in np.sort(hits)]
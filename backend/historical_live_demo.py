@@ -7,12 +7,47 @@ import sys
 import os
 from datetime import datetime, timedelta
 
+import pandas as pd
+
 # Add the parent directory to the path so we can import fire_perimeter
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fire_perimeter import FirePerimeterService, FirePerimeterType
 
 
+def _numeric_column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Get a property column as numbers, all-NaN if no feature has it"""
+    if name not in df.columns:
+        return pd.Series(float('nan'), index=df.index)
+    return pd.to_numeric(df[name], errors='coerce')
+
+
+def _count_fires_by_year(df: pd.DataFrame) -> pd.Series:
+    """
+    Count fires per discovery year
+    
+    Args:
+        df: Fire properties, one row per fire
+    
+    Returns:
+        Fire counts indexed by year string, most active year first
+    """
+    if 'FireDiscoveryDateTime' not in df.columns:
+        return pd.Series(dtype='int64')
+    
+    discovery = df['FireDiscoveryDateTime']
+    
+    # Dates arrive as epoch milliseconds or as strings starting with the year
+    epoch_ms = pd.to_numeric(discovery, errors='coerce')
+    epoch_years = pd.to_datetime(epoch_ms, unit='ms', errors='coerce').dt.year
+    text_years = discovery.where(epoch_ms.isna()).astype('string').str.slice(0, 4)
+    
+    years = epoch_years.astype('Int64').astype('string').fillna(text_years)
+    years = years[years.str.fullmatch(r'\d{4}', na=False)]
+    
+    return years.value_counts()
+
+
 def demo_historical_and_live_data():
     """Demonstrate both historical and live fire data capabilities"""
     
@@ -69,38 +104,24 @@ def demo_historical_and_live_data():
         print(f"   ✅ Found {historical_count} historical fires > 5,000 acres in CA")
         
         if historical_count > 0:
-            # Analyze historical data
-            fires_by_year = {}
-            total_acres = 0
+            # Analyze historical data in one vectorized pass over the properties
+            df = pd.DataFrame.from_records(
+                [feature.get('properties') or {} for feature in historical_fires['features']]
+            )
+            fires_by_year = _count_fires_by_year(df)
             
-            for feature in historical_fires['features']:
-                props = feature.get('properties', {})
-                
-                # Extract year from fire discovery date
-                discovery_date = props.get('FireDiscoveryDateTime', '')
-                if discovery_date:
-                    try:
-                        year = discovery_date[:4]  # First 4 characters should be year
-                        if year.isdigit():
-                            if year not in fires_by_year:
-                                fires_by_year[year] = 0
-                            fires_by_year[year] += 1
-                    except:
-                        pass
-                
-                # Sum total acres
-                acres = props.get('DailyAcres', 0) or props.get('GISAcres', 0)
-                if acres:
-                    total_acres += acres
+            # Sum total acres, falling back to GIS acres where daily acres are missing
+            daily_acres = _numeric_column(df, 'DailyAcres')
+            acres = daily_acres.where(daily_acres.fillna(0) != 0, _numeric_column(df, 'GISAcres'))
+            total_acres = float(acres.fillna(0).sum())
             
-            print(f"   🔥 Total Historical Acres: {total_acres:,} acres")
+            print(f"   🔥 Total Historical Acres: {total_acres:,.0f} acres")
             print(f"   📅 Years with Data: {len(fires_by_year)} years")
             
             # Show top years
-            if fires_by_year:
-                sorted_years = sorted(fires_by_year.items(), key=lambda x: x[1], reverse=True)
+            if not fires_by_year.empty:
                 print(f"   📊 Top Fire Years:")
-                for year, count in sorted_years[:5]:
+                for year, count in fires_by_year.head(5).items():
                     print(f"      • {year}: {count} large fires")
         
     except Exception as e:
@@ -110,17 +131,15 @@ def demo_historical_and_live_data():
     print("\n3. 📅 YEAR-TO-DATE DATA (2025 Fires)")
     print("-" * 40)
     try:
-        ytd_fires = fire_service.get_fire_perimeters(
-            perimeter_type=FirePerimeterType.YEAR_TO_DATE,
-            min_acres=500
-        )
-        
-        ytd_count = len(ytd_fires.get('features', []))
-        ytd_acres = sum(f.get('properties', {}).get('DailyAcres', 0) 
-                       for f in ytd_fires.get('features', []))
+        # Count and sum while the response streams in, in one pass over the fires
+        ytd_count = 0
+        ytd_acres = 0.0
+        for fire in fire_service.iter_fires(FirePerimeterType.YEAR_TO_DATE, min_acres=500):
+            ytd_count += 1
+            ytd_acres += fire.acres
         
         print(f"   ✅ Found {ytd_count} fires > 500 acres in 2025")
-        print(f"   🔥 Total YTD Acres: {ytd_acres:,} acres")
+        print(f"   🔥 Total YTD Acres: {ytd_acres:,.0f} acres")
         
     except Exception as e:
         print(f"   ❌ Error fetching YTD data: {str(e)}")
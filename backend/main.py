@@ -1,72 +1,362 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Body, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import Counter, Histogram
+from prometheus_fastapi_instrumentator import Instrumentator
+from pydantic import BaseModel, Field
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
 import logging
-from datetime import datetime
-from fire_perimeter import FirePerimeterService, FirePerimeterType
+import os
+from datetime import datetime, timezone
+from fire_perimeter import (
+    AsyncFirePerimeterService,
+    CacheEntry,
+    FirePerimeterType,
+    FireSpatialIndex,
+    TTLResponseCache,
+    annotate_ember_risk
+)
+from fire_perimeter.serialization import (
+    GEOJSON_SEQ_MEDIA_TYPE,
+    ORJSONResponse,
+    compact_feature_collection,
+    iter_feature_collection,
+    iter_geojson_seq
+)
+from fire_perimeter.spatial import snap_bbox_to_tiles
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="EmberAI Wildfire Detection API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the pooled upstream client when the worker starts and close it on shutdown"""
+    await async_fire_service.open()
+    try:
+        yield
+    finally:
+        await async_fire_service.close()
+
+# orjson serializes large GeoJSON FeatureCollections several times faster than
+# stdlib json; handlers return ORJSONResponse directly, which also skips
+# FastAPI's jsonable_encoder pass over every feature
+app = FastAPI(title="EmberAI Wildfire Detection API", version="1.0.0",
+              default_response_class=ORJSONResponse, lifespan=lifespan)
 
-# Allow frontend to connect
+# Allow frontend to connect: the Vite dev server by default, or the
+# comma-separated CORS_ORIGINS. An explicit list is required with credentials
+# (browsers ignore "*" then), and max_age lets browsers cache preflights
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.environ.get(
+        "CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173,http://localhost:3000"
+    ).split(",")
+    if origin.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "if-none-match", "cache-control"],
+    max_age=86400,
 )
 
-# Initialize fire perimeter service
-fire_service = FirePerimeterService()
+# GeoJSON compresses 5-10x; level 5 keeps most of that at a fraction of the
+# CPU of level 9, small bodies like /health are sent as-is, and the
+# middleware sets Vary: Accept-Encoding
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Per-route request counts and latency histograms at /metrics. Under several
+# workers, set PROMETHEUS_MULTIPROC_DIR so the workers' metrics are aggregated
+Instrumentator().instrument(app).expose(app, endpoint="/metrics", include_in_schema=False)
+
+# Upstream ArcGIS fetches and response cache outcomes, per perimeter type
+UPSTREAM_LATENCY = Histogram(
+    "emberai_upstream_fetch_seconds", "Latency of upstream ArcGIS fetches", ["perimeter_type"]
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "emberai_response_cache_lookups_total", "Response cache lookups by outcome", ["perimeter_type", "cache"]
+)
+
+# Initialize fire perimeter service; every upstream call shares its pooled HTTP/2 client
+async_fire_service = AsyncFirePerimeterService()
+
+# Properties kept by ?compact=true: the ones map popups and the analysis
+# routes read; upstream layers carry 50+
+PROPERTY_ALLOWLIST = frozenset({
+    "OBJECTID", "IRWINID", "IncidentName", "DailyAcres", "GISAcres", "PercentContained",
+    "POOState", "POOCounty", "FireCause", "FireDiscoveryDateTime", "StructuresThreated",
+    "InitialLatitude", "InitialLongitude"
+})
+
+# Zoom level bbox queries are snapped to; zoom 8 tiles are about 1.4 degrees wide
+TILE_ZOOM = 8
+
+# Seconds upstream responses are cached per perimeter type: live perimeters
+# change every few minutes, archived ones at most daily
+CACHE_TTL_SECONDS = {
+    FirePerimeterType.CURRENT: 60,
+    FirePerimeterType.YEAR_TO_DATE: 900,
+    FirePerimeterType.HISTORICAL: 86400,
+    FirePerimeterType.CERTIFIED: 86400
+}
+# Browser cache lifetimes per perimeter type, for conditional GeoJSON responses
+CLIENT_MAX_AGE_SECONDS = {
+    FirePerimeterType.CURRENT: 30,
+    FirePerimeterType.YEAR_TO_DATE: 300,
+    FirePerimeterType.HISTORICAL: 3600,
+    FirePerimeterType.CERTIFIED: 3600
+}
+# Entries kept per perimeter type; an archive entry can hold a couple of
+# thousand full-geometry perimeters (see ARCHIVE_MAX_PAGES), so far fewer fit
+CACHE_MAX_ENTRIES = {
+    FirePerimeterType.CURRENT: 256,
+    FirePerimeterType.YEAR_TO_DATE: 64,
+    FirePerimeterType.HISTORICAL: 16,
+    FirePerimeterType.CERTIFIED: 16
+}
+response_caches = {
+    perimeter_type: TTLResponseCache(maxsize=CACHE_MAX_ENTRIES[perimeter_type], ttl=ttl)
+    for perimeter_type, ttl in CACHE_TTL_SECONDS.items()
+}
+
+async def _cached_entry(request: Request, perimeter_type: FirePerimeterType, key: Hashable,
+                        fetch: Callable[[], Awaitable[Dict]]) -> CacheEntry:
+    """
+    Serve an upstream query from the response cache for its perimeter type
+    
+    Args:
+        request: Incoming request; Cache-Control: no-cache forces a fresh fetch
+        perimeter_type: Perimeter type queried, which selects the TTL
+        key: Hashable cache key built from the query parameters
+        fetch: Callable returning the awaitable upstream query, run on a miss
+    
+    Returns:
+        The (possibly cached) entry, whose GeoJSON data must not be mutated
+    """
+    refresh = "no-cache" in request.headers.get("cache-control", "").lower()
+    
+    async def timed_fetch() -> Dict:
+        with UPSTREAM_LATENCY.labels(perimeter_type=perimeter_type.name).time():
+            return await fetch()
+    
+    entry, cache_hit = await response_caches[perimeter_type].get_or_fetch_async(
+        key, timed_fetch, refresh=refresh
+    )
+    RESPONSE_CACHE_LOOKUPS.labels(perimeter_type=perimeter_type.name, cache="hit" if cache_hit else "miss").inc()
+    
+    # Remembered for _conditional_response, which derives the response ETag from it
+    request.state.source_etag = entry.etag
+    
+    return entry
+
+async def _cached_fetch(request: Request, perimeter_type: FirePerimeterType, key: Hashable,
+                        fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+    """Like _cached_entry, returning just the GeoJSON response"""
+    return (await _cached_entry(request, perimeter_type, key, fetch)).data
+
+async def _spatial_index(entry: CacheEntry) -> FireSpatialIndex:
+    """STRtree over a cached response's features, built once per cache refresh"""
+    return await asyncio.to_thread(
+        entry.derive, "spatial_index", lambda: FireSpatialIndex(entry.data.get('features', []))
+    )
+
+def _request_timestamp(request: Request) -> str:
+    """UTC ISO 8601 timestamp of a request, formatted once however often it is used"""
+    timestamp = getattr(request.state, "timestamp", None)
+    if timestamp is None:
+        timestamp = request.state.timestamp = datetime.now(timezone.utc).isoformat()
+    return timestamp
+
+def _parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Parse an 'xmin,ymin,xmax,ymax' query value, rejecting malformed boxes with 400"""
+    try:
+        xmin, ymin, xmax, ymax = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'xmin,ymin,xmax,ymax'")
+    
+    return xmin, ymin, xmax, ymax
+
+async def _get_perimeters_entry(request: Request, perimeter_type: FirePerimeterType, **filters) -> CacheEntry:
+    """Fetch fire perimeters through the response cache, returning the cache entry"""
+    # Unset filters are left out so equivalent queries share one entry
+    key = ("perimeters", perimeter_type, *sorted((name, value) for name, value in filters.items() if value is not None))
+    
+    # Paged f=json queries, fetched concurrently, are not cut off at the layer's maxRecordCount
+    return await _cached_entry(request, perimeter_type, key, lambda: async_fire_service.get_fire_perimeters_async(
+        perimeter_type, **filters
+    ))
+
+async def _get_high_priority_entry(request: Request, min_acres: int, max_containment: int, structures_threatened: int) -> CacheEntry:
+    """Fetch live high-priority fires through the response cache, returning the cache entry"""
+    key = ("high-priority", min_acres, max_containment, structures_threatened)
+    
+    return await _cached_entry(request, FirePerimeterType.CURRENT, key, lambda: async_fire_service.get_high_priority_fires_async(
+        min_acres=min_acres,
+        max_containment=max_containment,
+        structures_threatened=structures_threatened
+    ))
 
 @app.get("/")
 def read_root():
     return {"message": "EmberAI Wildfire Detection API running!", "version": "1.0.0"}
 
+def _stream_feature_collection(fires: Dict, compact: bool = False, precision: Optional[int] = None,
+                               response_format: str = "json") -> StreamingResponse:
+    """
+    Send a FeatureCollection in encoded batches instead of one buffered body
+    
+    With response_format="geojsonseq" the features are sent as an RFC 8142
+    GeoJSON text sequence with no FeatureCollection wrapper. Every record is
+    self-delimiting, so clients can parse features as they arrive and keep
+    the complete records of an interrupted download
+    
+    Args:
+        fires: GeoJSON FeatureCollection, left unmodified
+        compact: Drop properties outside PROPERTY_ALLOWLIST
+        precision: Decimal places to round coordinates to, or None for full precision
+        response_format: "json" or "geojsonseq"
+    
+    Returns:
+        Streaming GeoJSON response
+    """
+    if compact or precision is not None:
+        fires = compact_feature_collection(fires, PROPERTY_ALLOWLIST if compact else None, precision)
+    
+    if response_format == "geojsonseq":
+        return StreamingResponse(iter_geojson_seq(fires.get('features') or []), media_type=GEOJSON_SEQ_MEDIA_TYPE)
+    
+    return StreamingResponse(iter_feature_collection(fires), media_type="application/geo+json")
+
+def _conditional_response(request: Request, perimeter_type: FirePerimeterType,
+                          build: Callable[[], Response]) -> Response:
+    """
+    Answer 304 Not Modified when the client already has this response
+    
+    A response is determined by the cached upstream data and the request's
+    path and query parameters, so the ETag is derived from those without
+    serializing anything; build only runs when the client needs a body
+    
+    Args:
+        request: Incoming request, after a _cached_entry lookup
+        perimeter_type: Perimeter type queried, which selects the max-age
+        build: Callable returning the full response
+    
+    Returns:
+        A 304 response or the built response, both with ETag and Cache-Control set
+    """
+    variant = f"{request.state.source_etag}|{request.url.path}|{sorted(request.query_params.multi_items())}"
+    etag = 'W/"' + hashlib.blake2b(variant.encode(), digest_size=16).hexdigest() + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CLIENT_MAX_AGE_SECONDS[perimeter_type]}"
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    
+    response = build()
+    response.headers.update(headers)
+    
+    return response
+
+async def _perimeters_response(request: Request, perimeter_type: FirePerimeterType,
+                               area: Optional[Tuple[float, float, float, float]] = None, compact: bool = False,
+                               precision: Optional[int] = None, response_format: str = "json",
+                               **filters) -> Response:
+    """
+    Serve a fire perimeter query as GeoJSON through the response cache
+    
+    A bbox filter is widened to the slippy-map tiles covering it, so viewports
+    that differ by a small pan share one upstream query and cache entry; the
+    result is then clipped back to the requested box. Unchanged upstream data
+    is sent as bytes encoded once per cache refresh instead of per request
+    
+    Args:
+        request: Incoming request
+        perimeter_type: Type of perimeter data to fetch
+        area: Bounding box from _parse_bbox, or None for no spatial filter
+        compact: Drop properties outside PROPERTY_ALLOWLIST
+        precision: Decimal places to round coordinates to, or None for full precision
+        response_format: "json" or "geojsonseq"
+        **filters: Query filters accepted by get_fire_perimeters_async
+    
+    Returns:
+        GeoJSON response, or 304 Not Modified
+    """
+    if area is not None:
+        filters['bbox'] = ','.join(str(value) for value in snap_bbox_to_tiles(*area, zoom=TILE_ZOOM))
+    
+    entry = await _get_perimeters_entry(request, perimeter_type, **filters)
+    
+    if area is None and not compact and precision is None and response_format == "json":
+        return _conditional_response(request, perimeter_type, lambda: Response(
+            content=entry.body, media_type="application/geo+json"
+        ))
+    
+    fires = entry.data
+    if area is not None:
+        index = await _spatial_index(entry)
+        fires = {**fires, 'features': index.query_bbox(*area)}
+    
+    return _conditional_response(request, perimeter_type, lambda: _stream_feature_collection(
+        fires, compact, precision, response_format
+    ))
+
 # LIVE FIRE DATA ROUTES
 @app.get("/api/fires/live/current")
 async def get_live_current_fires(
+    request: Request,
     state: Optional[str] = Query(None, description="Two-letter state code (e.g., 'CA', 'TX')"),
     min_acres: Optional[int] = Query(None, description="Minimum fire size in acres"),
     max_age_days: Optional[int] = Query(None, description="Maximum fire age in days"),
-    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'")
+    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'"),
+    compact: bool = Query(False, description="Only return the commonly displayed fire properties"),
+    precision: Optional[int] = Query(None, ge=0, le=15, description="Decimal places to round coordinates to (5 is about 1 m)"),
+    format: str = Query("json", pattern="^(json|geojsonseq)$", description="Response format: 'json' or 'geojsonseq' (GeoJSON text sequence)")
 ):
     """Get live/current active fires with optional filtering"""
+    area = _parse_bbox(bbox) if bbox else None
+    
     try:
-        fires = fire_service.get_fire_perimeters(
-            perimeter_type=FirePerimeterType.CURRENT,
+        return await _perimeters_response(
+            request,
+            FirePerimeterType.CURRENT,
+            area=area,
+            compact=compact,
+            precision=precision,
+            response_format=format,
             state_code=state,
             min_acres=min_acres,
-            max_age_days=max_age_days,
-            bbox=bbox
+            max_age_days=max_age_days
         )
         
-        return JSONResponse(content=fires)
-        
     except Exception as e:
         logger.error(f"Error fetching live current fires: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/fires/live/high-priority")
 async def get_live_high_priority_fires(
+    request: Request,
     min_acres: int = Query(1000, description="Minimum fire size in acres"),
     max_containment: int = Query(50, description="Maximum containment percentage"),
     structures_threatened: int = Query(1, description="Minimum structures threatened")
 ):
     """Get live high-priority fires for ember spotfire analysis"""
     try:
-        fires = fire_service.get_high_priority_fires(
-            min_acres=min_acres,
-            max_containment=max_containment,
-            structures_threatened=structures_threatened
-        )
+        entry = await _get_high_priority_entry(request, min_acres, max_containment, structures_threatened)
         
-        return JSONResponse(content=fires)
+        # Sent as returned upstream, so the encoded body is reused until the entry expires
+        return _conditional_response(request, FirePerimeterType.CURRENT, lambda: Response(
+            content=entry.body, media_type="application/json"
+        ))
         
     except Exception as e:
         logger.error(f"Error fetching live high-priority fires: {str(e)}")
@@ -74,66 +364,64 @@ async def get_live_high_priority_fires(
 
 @app.get("/api/fires/live/nearby")
 async def get_live_nearby_fires(
+    request: Request,
     latitude: float = Query(..., description="Latitude in decimal degrees"),
     longitude: float = Query(..., description="Longitude in decimal degrees"),
     radius_miles: float = Query(50, description="Search radius in miles")
 ):
     """Get live fires within a specified radius of coordinates"""
     try:
-        fires = fire_service.get_fires_by_coordinates(
-            latitude=latitude,
-            longitude=longitude,
-            radius_miles=radius_miles
-        )
+        # Answered from an STRtree over the cached current fires instead of an upstream query per point
+        entry = await _get_perimeters_entry(request, FirePerimeterType.CURRENT)
+        index = await _spatial_index(entry)
+        fires = {**entry.data, 'features': index.query_radius(latitude, longitude, radius_miles)}
         
-        return JSONResponse(content=fires)
+        return ORJSONResponse(content=fires)
         
     except Exception as e:
         logger.error(f"Error fetching live nearby fires: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/fires/live/stats")
-async def get_live_fire_statistics():
-    """Get summary statistics for live fire activity"""
+# Points accepted by one /live/nearby/batch call
+MAX_NEARBY_BATCH = 100
+
+class NearbyQuery(BaseModel):
+    """One point of a batched nearby-fires query"""
+    latitude: float = Field(..., description="Latitude in decimal degrees")
+    longitude: float = Field(..., description="Longitude in decimal degrees")
+    radius_miles: float = Field(50, description="Search radius in miles")
+
+@app.post("/api/fires/live/nearby/batch")
+async def get_live_nearby_fires_batch(
+    request: Request,
+    queries: List[NearbyQuery] = Body(..., min_length=1, max_length=MAX_NEARBY_BATCH)
+):
+    """Get live fires near several points in one call, all answered from one spatial index"""
     try:
-        # Get current fires
-        current_fires = fire_service.get_fire_perimeters(FirePerimeterType.CURRENT)
+        entry = await _get_perimeters_entry(request, FirePerimeterType.CURRENT)
+        index = await _spatial_index(entry)
+        results = [
+            {**entry.data, 'features': index.query_radius(query.latitude, query.longitude, query.radius_miles)}
+            for query in queries
+        ]
         
-        # Calculate statistics
-        features = current_fires.get('features', [])
+        return ORJSONResponse(content={"results": results})
         
-        if not features:
-            return JSONResponse(content={
-                "total_fires": 0,
-                "total_acres": 0,
-                "avg_acres_per_fire": 0,
-                "states_affected": 0,
-                "largest_fire": None,
-                "timestamp": datetime.now().isoformat()
-            })
-        
-        total_acres = sum(feature.get('properties', {}).get('DailyAcres', 0) for feature in features)
-        states = set(feature.get('properties', {}).get('POOState', '') for feature in features)
-        
-        # Find largest fire
-        largest_fire = max(features, key=lambda x: x.get('properties', {}).get('DailyAcres', 0))
-        largest_fire_info = {
-            "name": largest_fire.get('properties', {}).get('IncidentName', 'Unknown'),
-            "acres": largest_fire.get('properties', {}).get('DailyAcres', 0),
-            "state": largest_fire.get('properties', {}).get('POOState', 'Unknown'),
-            "containment": largest_fire.get('properties', {}).get('PercentContained', 0)
-        }
-        
-        stats = {
-            "total_fires": len(features),
-            "total_acres": total_acres,
-            "avg_acres_per_fire": total_acres / len(features) if features else 0,
-            "states_affected": len(states),
-            "largest_fire": largest_fire_info,
-            "timestamp": datetime.now().isoformat()
-        }
+    except Exception as e:
+        logger.error(f"Error fetching batched nearby fires: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/fires/live/stats")
+async def get_live_fire_statistics(request: Request):
+    """Get summary statistics for live fire activity"""
+    try:
+        # Aggregated by the ArcGIS server; copied so the cached entry stays untouched
+        stats = dict(await _cached_fetch(
+            request, FirePerimeterType.CURRENT, ("statistics",), async_fire_service.get_statistics_async
+        ))
+        stats["timestamp"] = _request_timestamp(request)
         
-        return JSONResponse(content=stats)
+        return ORJSONResponse(content=stats)
         
     except Exception as e:
         logger.error(f"Error calculating live fire statistics: {str(e)}")
@@ -142,70 +430,107 @@ async def get_live_fire_statistics():
 # HISTORICAL FIRE DATA ROUTES
 @app.get("/api/fires/historical/perimeters")
 async def get_historical_fire_perimeters(
+    request: Request,
     state: Optional[str] = Query(None, description="Two-letter state code"),
     min_acres: Optional[int] = Query(1000, description="Minimum fire size in acres"),
-    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'")
+    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'"),
+    compact: bool = Query(False, description="Only return the commonly displayed fire properties"),
+    precision: Optional[int] = Query(None, ge=0, le=15, description="Decimal places to round coordinates to (5 is about 1 m)"),
+    format: str = Query("json", pattern="^(json|geojsonseq)$", description="Response format: 'json' or 'geojsonseq' (GeoJSON text sequence)")
 ):
     """Get historical fire perimeter data"""
+    area = _parse_bbox(bbox) if bbox else None
+    
     try:
-        fires = fire_service.get_fire_perimeters(
-            perimeter_type=FirePerimeterType.HISTORICAL,
+        return await _perimeters_response(
+            request,
+            FirePerimeterType.HISTORICAL,
+            area=area,
+            compact=compact,
+            precision=precision,
+            response_format=format,
             state_code=state,
-            min_acres=min_acres,
-            bbox=bbox
+            min_acres=min_acres
         )
         
-        return JSONResponse(content=fires)
-        
     except Exception as e:
         logger.error(f"Error fetching historical fires: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/fires/historical/year-to-date")
 async def get_year_to_date_fires(
+    request: Request,
     state: Optional[str] = Query(None, description="Two-letter state code"),
     min_acres: Optional[int] = Query(500, description="Minimum fire size in acres"),
-    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'")
+    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'"),
+    compact: bool = Query(False, description="Only return the commonly displayed fire properties"),
+    precision: Optional[int] = Query(None, ge=0, le=15, description="Decimal places to round coordinates to (5 is about 1 m)"),
+    format: str = Query("json", pattern="^(json|geojsonseq)$", description="Response format: 'json' or 'geojsonseq' (GeoJSON text sequence)")
 ):
     """Get year-to-date fire data"""
+    area = _parse_bbox(bbox) if bbox else None
+    
     try:
-        fires = fire_service.get_fire_perimeters(
-            perimeter_type=FirePerimeterType.YEAR_TO_DATE,
+        return await _perimeters_response(
+            request,
+            FirePerimeterType.YEAR_TO_DATE,
+            area=area,
+            compact=compact,
+            precision=precision,
+            response_format=format,
             state_code=state,
-            min_acres=min_acres,
-            bbox=bbox
+            min_acres=min_acres
         )
         
-        return JSONResponse(content=fires)
-        
     except Exception as e:
         logger.error(f"Error fetching year-to-date fires: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/fires/historical/certified")
 async def get_certified_fire_perimeters(
+    request: Request,
     state: Optional[str] = Query(None, description="Two-letter state code"),
     min_acres: Optional[int] = Query(1000, description="Minimum fire size in acres"),
-    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'")
+    bbox: Optional[str] = Query(None, description="Bounding box 'xmin,ymin,xmax,ymax'"),
+    compact: bool = Query(False, description="Only return the commonly displayed fire properties"),
+    precision: Optional[int] = Query(None, ge=0, le=15, description="Decimal places to round coordinates to (5 is about 1 m)"),
+    format: str = Query("json", pattern="^(json|geojsonseq)$", description="Response format: 'json' or 'geojsonseq' (GeoJSON text sequence)")
 ):
     """Get certified fire perimeter data"""
+    area = _parse_bbox(bbox) if bbox else None
+    
     try:
-        fires = fire_service.get_fire_perimeters(
-            perimeter_type=FirePerimeterType.CERTIFIED,
+        return await _perimeters_response(
+            request,
+            FirePerimeterType.CERTIFIED,
+            area=area,
+            compact=compact,
+            precision=precision,
+            response_format=format,
             state_code=state,
-            min_acres=min_acres,
-            bbox=bbox
+            min_acres=min_acres
         )
         
-        return JSONResponse(content=fires)
-        
     except Exception as e:
         logger.error(f"Error fetching certified fires: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # EMBER ANALYSIS ROUTES
+def _with_ember_risk(fires: Dict, analysis_timestamp: str) -> Dict:
+    """Vectorized ember risk analysis, on copies so the cached response stays untouched"""
+    if not fires or not fires.get('features'):
+        return fires
+    
+    features = annotate_ember_risk(fires['features'])
+    
+    for feature in features:
+        feature['properties']['analysis_timestamp'] = analysis_timestamp
+    
+    return {**fires, 'features': features}
+
 @app.get("/api/ember/danger-zones")
 async def get_ember_danger_zones(
+    request: Request,
     state: Optional[str] = Query(None, description="Two-letter state code"),
     min_acres: int = Query(500, description="Minimum fire size for danger zone analysis"),
     wind_speed_threshold: float = Query(15.0, description="Wind speed threshold (mph) for ember transport")
@@ -213,41 +538,16 @@ async def get_ember_danger_zones(
     """Get fires that pose ember spotfire danger"""
     try:
         # Get fires that are large enough and not fully contained
-        fires = fire_service.get_high_priority_fires(
+        entry = await _get_high_priority_entry(
+            request,
             min_acres=min_acres,
             max_containment=80,  # Less than 80% contained
             structures_threatened=0  # Any structures
         )
         
-        # Enhanced ember risk analysis
-        if fires and fires.get('features'):
-            for feature in fires['features']:
-                properties = feature.get('properties', {})
-                
-                # Add ember risk assessment
-                acres = properties.get('DailyAcres', 0)
-                containment = properties.get('PercentContained', 0)
-                
-                # Risk scoring algorithm
-                risk_score = 0
-                if acres > 5000:
-                    risk_score += 3
-                elif acres > 1000:
-                    risk_score += 2
-                else:
-                    risk_score += 1
-                
-                if containment < 25:
-                    risk_score += 2
-                elif containment < 50:
-                    risk_score += 1
-                
-                properties['ember_risk_score'] = risk_score
-                properties['ember_risk_level'] = 'HIGH' if risk_score >= 4 else 'MEDIUM' if risk_score >= 2 else 'LOW'
-                properties['danger_zone_radius_miles'] = min(risk_score * 2, 10)  # Max 10 miles
-                properties['analysis_timestamp'] = datetime.now().isoformat()
-        
-        return JSONResponse(content=fires)
+        return _conditional_response(request, FirePerimeterType.CURRENT, lambda: ORJSONResponse(
+            content=_with_ember_risk(entry.data, _request_timestamp(request))
+        ))
         
     except Exception as e:
         logger.error(f"Error generating ember danger zones: {str(e)}")
@@ -255,32 +555,48 @@ async def get_ember_danger_zones(
 
 # HEALTH CHECK
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint"""
     try:
-        # Test API connectivity
-        test_fires = fire_service.get_fire_perimeters(FirePerimeterType.CURRENT)
+        # Test API connectivity (at most once per CURRENT TTL unless no-cache is sent)
+        test_fires = (await _get_perimeters_entry(request, FirePerimeterType.CURRENT)).data
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "status": "healthy",
             "api_connectivity": "ok",
             "fire_service": "operational",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _request_timestamp(request),
             "active_fires_count": len(test_fires.get('features', []))
         })
         
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
                 "error": str(e),
                 "api_connectivity": "failed",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _request_timestamp(request)
             }
         )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    
+    if os.environ.get("ENV") == "dev":
+        # Auto-reload only supports a single worker
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        # One worker process per core; "auto" picks uvloop and httptools when
+        # installed. Each worker keeps its own response cache
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=int(os.environ.get("PORT", 8000)),
+            workers=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+            loop="auto",
+            http="auto",
+            timeout_keep_alive=30,
+            log_level="warning"
+        )
@@ -2,7 +2,9 @@
 Simple test to verify fire perimeter data is working
 """
 from fire_perimeter import FirePerimeterService, FirePerimeterType
-import json
+from fire_perimeter.serialization import iter_geojson_seq
+import orjson
+import sys
 
 # Test current fires
 fs = FirePerimeterService()
@@ -22,7 +24,13 @@ print("\nTesting historical fires (no filters)...")
 hist_result = fs.get_fire_perimeters(FirePerimeterType.HISTORICAL)
 print(f"Found {len(hist_result.get('features', []))} historical fires")
 
-# Export sample
-with open('test_export.json', 'w') as f:
-    json.dump(result, f, indent=2, default=str)
-print("Exported sample to test_export.json")
+# Export sample; --seq streams the features to a GeoJSON text sequence
+# instead, so large exports never hold the whole collection in memory
+if '--seq' in sys.argv[1:]:
+    with open('test_export.geojsonseq', 'wb') as f:
+        f.writelines(iter_geojson_seq(fs.iter_fire_perimeters(FirePerimeterType.CURRENT)))
+    print("Exported sample to test_export.geojsonseq")
+else:
+    with open('test_export.json', 'wb') as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC))
+    print("Exported sample to test_export.json")